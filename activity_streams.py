@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Columnar NumPy representation of Strava activity streams.
+
+Strava returns every stream as a JSON list. ActivityStreams turns them
+into typed arrays on a shared time index, with a mask per stream marking
+the samples that are actually present, and the summary functions below
+work on whole arrays instead of indexing sample by sample.
+
+    >>> streams = ActivityStreams.from_strava(raw_streams)
+    >>> normalized_power(streams)
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Streams requested by strava_activities.get_activity_details
+STREAM_KEYS = ('heartrate', 'watts', 'velocity_smooth', 'cadence', 'temp')
+
+# Gaps longer than this (auto-pause, smart recording) do not count as time in a zone
+MAX_SAMPLE_GAP = 5
+
+SPEED_FACTORS = {
+    'm/s': 1.0,
+    'km/h': 3.6,
+    'mph': 2.2369362920544,
+}
+
+
+class ActivityStreams:
+    """Activity streams as float64 arrays sharing one int64 time index."""
+
+    def __init__(self, time: np.ndarray, channels: Dict[str, np.ndarray]):
+        self.time = time
+        self.channels = channels
+        self.masks = {key: ~np.isnan(values) for key, values in channels.items()}
+
+    @classmethod
+    def from_strava(cls, streams: Dict[str, Any]) -> 'ActivityStreams':
+        """Build from a key_by_type streams response.
+
+        Missing samples (None) become NaN and are masked out. Streams that
+        are shorter or longer than the time stream are padded or cut.
+        """
+        time = np.asarray(streams.get('time', {}).get('data', []), dtype=np.int64)
+        length = len(time)
+        channels = {}
+        for key, stream in streams.items():
+            if key == 'time':
+                continue
+            values = np.array(stream.get('data', []), dtype=np.float64)
+            if len(values) < length:
+                values = np.concatenate([values, np.full(length - len(values), np.nan)])
+            channels[key] = values[:length]
+        return cls(time, channels)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.channels and bool(self.masks[key].any())
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Values of a stream with NaN for missing samples, or None."""
+        return self.channels.get(key)
+
+    def mask(self, key: str) -> np.ndarray:
+        """Boolean mask of present samples, all False for a missing stream."""
+        if key in self.masks:
+            return self.masks[key]
+        return np.zeros(len(self.time), dtype=bool)
+
+    def durations(self) -> np.ndarray:
+        """Seconds each sample stands for, with pauses capped at MAX_SAMPLE_GAP."""
+        if not len(self.time):
+            return np.zeros(0)
+        return np.minimum(np.diff(self.time, append=self.time[-1] + 1), MAX_SAMPLE_GAP)
+
+    def resample(self, key: str, fill: float = 0.0) -> np.ndarray:
+        """Stream resampled to 1 Hz over the activity, missing samples as fill."""
+        values = self.channels[key]
+        mask = self.masks[key]
+        if not len(self.time):
+            return np.zeros(0)
+        grid = np.arange(self.time[0], self.time[-1] + 1)
+        filled = np.where(mask, values, fill)
+        # Recording gaps are filled, not interpolated across
+        index = np.searchsorted(self.time, grid, side='right') - 1
+        resampled = filled[index]
+        resampled[grid - self.time[index] > MAX_SAMPLE_GAP] = fill
+        return resampled
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing moving average over `window` samples, ignoring NaN.
+
+    The first window-1 results average over the samples available so far.
+    Windows without any valid sample are NaN.
+    """
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0))
+    counts = np.cumsum(valid)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def normalized_power(streams: ActivityStreams, window: int = 30) -> Optional[float]:
+    """Normalized power in watts: 4th-power mean of the 30 s rolling power."""
+    if 'watts' not in streams:
+        return None
+    power = streams.resample('watts')
+    if len(power) < window:
+        return None
+    cumulative = np.cumsum(np.concatenate([[0.0], power]))
+    rolling = (cumulative[window:] - cumulative[:-window]) / window
+    return float(np.mean(rolling ** 4) ** 0.25)
+
+
+def time_in_zones(streams: ActivityStreams, key: str, bounds: Sequence[float]) -> Optional[np.ndarray]:
+    """Seconds spent in each zone of a stream.
+
+    Args:
+        streams: Activity streams
+        key: Stream to bin, e.g. 'heartrate' or 'watts'
+        bounds: Ascending zone boundaries, n boundaries give n + 1 zones
+
+    Returns:
+        Array of seconds per zone, or None if the stream is missing
+    """
+    if key not in streams:
+        return None
+    mask = streams.mask(key)
+    zones = np.digitize(streams.get(key)[mask], bounds)
+    return np.bincount(zones, weights=streams.durations()[mask], minlength=len(bounds) + 1)
+
+
+def convert_speed(values: np.ndarray, unit: str = 'km/h') -> np.ndarray:
+    """Convert speeds from m/s to 'km/h', 'mph' or pace in 'min/km'."""
+    if unit == 'min/km':
+        with np.errstate(divide='ignore'):
+            return np.where(values > 0, 1000 / 60 / values, np.nan)
+    return values * SPEED_FACTORS[unit]
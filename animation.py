@@ -0,0 +1,80 @@
+"""
+Frame-timed animation engine for the LED matrix.
+
+An Animation is a number of frames, a frame period and a render function
+that draws frame i from scratch. Player.frames() renders them against
+time.ticks_ms deadlines measured from the first frame, so the frame rate
+does not drift with render time. When rendering falls behind, the frames
+that are already overdue are skipped and the one due now is drawn, which
+merges them into a single update. The last frame is always drawn, so an
+animation ends in the same state however many frames were dropped.
+
+Player.frames() is a generator yielding the milliseconds until the next
+deadline, the caller sleeps (time.sleep_ms or await asyncio.sleep_ms):
+
+    >>> player = Player()
+    >>> scroll = Animation(64, 50, lambda i: draw(32 - i))
+    >>> for wait in player.frames(scroll):
+    ...     time.sleep_ms(wait)
+    >>> player.describe()
+    '64 frames, 20.0 fps, 0 dropped'
+"""
+
+import time
+
+class Animation:
+    def __init__(self, frames, period_ms, render):
+        """
+        Args:
+            frames (int): Number of frames
+            period_ms (int): Time between two frames in milliseconds
+            render: Function drawing frame i (0 to frames - 1) and showing it
+        """
+        self.frames = frames
+        self.period_ms = period_ms
+        self.render = render
+
+class Player:
+    """Plays animations and counts rendered and dropped frames."""
+
+    def __init__(self):
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.rendered = 0
+        self.dropped = 0
+        self.elapsed_ms = 0
+
+    def frames(self, animation):
+        """Render an animation on its deadlines, yields ms until the next frame."""
+        count = animation.frames
+        period = animation.period_ms
+        render = animation.render
+        start = time.ticks_ms()
+        index = 0
+        try:
+            while index < count:
+                render(index)
+                self.rendered += 1
+                index += 1
+                now = time.ticks_ms()
+                if index < count - 1 and period:
+                    # Skip to the frame that is due now, keeping the last one
+                    due = time.ticks_diff(now, start) // period
+                    if due > index:
+                        due = min(due, count - 1)
+                        self.dropped += due - index
+                        index = due
+                wait = time.ticks_diff(time.ticks_add(start, index * period), now)
+                yield wait if wait > 0 else 0
+        finally:
+            self.elapsed_ms += time.ticks_diff(time.ticks_ms(), start)
+
+    def fps(self):
+        """Achieved frames per second over everything played so far."""
+        if not self.elapsed_ms:
+            return 0.0
+        return self.rendered * 1000 / self.elapsed_ms
+
+    def describe(self):
+        return f"{self.rendered} frames, {self.fps():.1f} fps, {self.dropped} dropped"
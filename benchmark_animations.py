@@ -0,0 +1,161 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Benchmark of the d1_mini_gear_check animations on the simulated display.
+
+Runs every animation of the firmware against display_sim's MAX7219 chain
+and reports frames shown, render time per frame, SPI writes and bytes,
+animation length on the device clock and peak traced memory. Results are
+compared with the baseline in benchmark_animations.json: frame and SPI
+counts must not grow, render time and memory may grow by --tolerance.
+Any regression makes the run exit with status 1.
+
+    python benchmark_animations.py [--runs N] [--tolerance 0.5]
+    python benchmark_animations.py --update     # write a new baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import display_sim
+display_sim.install()
+
+from benchmark_gear_memory import install_mocks
+install_mocks()
+
+import d1_mini_gear_check as firmware
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_animations.json')
+
+
+def still_frames(text):
+    """A single static frame, as drawn by display_text."""
+    firmware.display_text(text)
+    yield 0
+
+
+# Name and frame generator of every animation the firmware plays
+ANIMATIONS = (
+    ('startup', lambda: firmware.startup_frames()),
+    ('scroll_name', lambda: firmware.scroll_frames("Road Bike")),
+    ('scroll_ip', lambda: firmware.scroll_frames("IP: 192.168.178.42")),
+    ('count_up', lambda: firmware.count_up_frames(1234.5)),
+    ('update', lambda: firmware.update_frames(1198.2, 1234.5)),
+    ('display_text', lambda: still_frames("1234.5km")),
+)
+
+# Metrics that are exact on the simulator and may not grow at all
+EXACT = ('frames', 'spi_writes', 'spi_bytes')
+# Metrics that vary between runs and may grow by the tolerance, plus an
+# absolute slack for single-frame timings close to the timer resolution
+MEASURED = ('render_us_per_frame', 'peak_bytes')
+SLACK = {'render_us_per_frame': 20, 'peak_bytes': 0}
+
+
+def play(frames):
+    """Clear the display, play the frames and return the real time spent rendering."""
+    board = display_sim.board
+    firmware.display.fill(0)
+    firmware.display.invalidate()
+    firmware.display.show()
+    board.reset_stats()
+    start = time.perf_counter()
+    for wait in frames:
+        time.sleep_ms(wait)
+    board.commit()
+    return time.perf_counter() - start
+
+
+def measure(make_frames, runs):
+    """Metrics of one animation: the fastest of `runs` plays, then one traced play."""
+    board = display_sim.board
+    render = None
+    for _ in range(runs):
+        started = board.clock.ticks_ms()
+        elapsed = play(make_frames())
+        duration = board.clock.ticks_ms() - started
+        render = elapsed if render is None else min(render, elapsed)
+    frames = board.trace.frames
+    result = {
+        'frames': frames,
+        'spi_writes': board.spi_writes,
+        'spi_bytes': board.spi_bytes,
+        'duration_ms': duration,
+        'render_us_per_frame': round(render * 1e6 / max(frames, 1), 1),
+    }
+    tracemalloc.start()
+    play(make_frames())
+    result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in EXACT:
+            if result[metric] > expected[metric]:
+                regressions.append(f"{name}: {metric} {expected[metric]} -> {result[metric]}")
+        for metric in MEASURED:
+            if result[metric] > expected[metric] * (1 + tolerance) + SLACK[metric]:
+                regressions.append(f"{name}: {metric} {expected[metric]} -> {result[metric]} "
+                                   f"(+{result[metric] / expected[metric] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help="plays per animation, the fastest counts")
+    # Render times of a few tens of microseconds are noisy on a desktop
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed growth of render time and memory (default 0.5 = 50%%)")
+    parser.add_argument('--update', action='store_true', help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'animation':<14}{'frames':>7}{'us/frame':>10}{'SPI writes':>12}{'SPI bytes':>11}"
+          f"{'length ms':>11}{'peak B':>9}")
+    # The firmware prints when an animation drops frames, keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        for name, make_frames in ANIMATIONS:
+            results[name] = measure(make_frames, args.runs)
+    for name, result in results.items():
+        print(f"{name:<14}{result['frames']:>7}{result['render_us_per_frame']:>10.1f}"
+              f"{result['spi_writes']:>12}{result['spi_bytes']:>11}{result['duration_ms']:>11}"
+              f"{result['peak_bytes']:>9}")
+    if log.getvalue():
+        print(log.getvalue(), end='')
+
+    if args.update:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {BASELINE_FILE}")
+        return
+
+    if not os.path.exists(BASELINE_FILE):
+        print("No baseline yet, run with --update to create one")
+        return
+    with open(BASELINE_FILE) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
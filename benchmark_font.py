@@ -0,0 +1,68 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Host-side benchmark for custom_font.draw_text.
+
+Compares the per-frame render time of the precompiled glyphs against the
+original per-pixel bit loop, for byte-aligned text (the count-up
+animations) and for an unaligned offset that goes through blit().
+Both renderers must produce the same buffer, this is checked first.
+Note that blit() is native on the device but simulated in Python here,
+so the unaligned case understates the gain on hardware.
+
+    python benchmark_font.py [frames]
+"""
+
+import sys
+import time
+
+import display_sim
+display_sim.install()
+
+import max7219
+import custom_font
+
+
+def legacy_draw_text(display, text, x, y, font_type='large'):
+    """draw_text as it was before the glyphs were precompiled."""
+    current_x = x
+    for char in text:
+        bitmap = custom_font.get_char(char, font_type)
+        for row, data in enumerate(bitmap):
+            for col in range(8):
+                if data & (1 << (7 - col)):
+                    display.pixel(current_x + col, y + row, 1)
+        current_x += 8
+
+
+def render(display, draw, text, x, frames):
+    """Render `frames` frames of `text` and return seconds per frame."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        display.fill(0)
+        draw(display, text, x, 0, 'large')
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    display = max7219.Matrix8x8(display_sim.FakeSPI(), display_sim.FakeCS(), 4)
+
+    print(f"=== draw_text render time, {frames} frames ===")
+    for text, x in (("1234", 0), ("8888", 0), ("1234", 3)):
+        display.fill(0)
+        legacy_draw_text(display, text, x, 0)
+        expected = bytes(display.buffer)
+        display.fill(0)
+        custom_font.draw_text(display, text, x, 0)
+        if bytes(display.buffer) != expected:
+            raise SystemExit(f"Render mismatch for {text!r} at x={x}")
+
+        legacy = render(display, legacy_draw_text, text, x, frames)
+        current = render(display, custom_font.draw_text, text, x, frames)
+        print(f"{text!r} at x={x}: legacy {legacy * 1e6:8.1f} us/frame, "
+              f"glyphs {current * 1e6:8.1f} us/frame ({legacy / current:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Host-side memory check for the multi-gear fetch of d1_mini_gear_check.
+
+Imports the firmware against mock `urequests`, `network` and `credentials`
+modules, display_sim's `machine` and CPython's asyncio as `uasyncio`, lets
+fetch_gear_record() fetch a growing number of gear IDs from canned
+/gear/{id} answers and reports the peak traced memory of the fetch,
+split into the kept records and the working memory above them. The
+working memory must stay flat as the gear count grows, only the small
+records accumulate.
+
+    python benchmark_gear_memory.py
+"""
+
+import contextlib
+import gc
+import io
+import asyncio
+import json
+import os
+import sys
+import tracemalloc
+import types
+
+import display_sim
+display_sim.install()
+
+DESCRIPTION = "Commuter, new chain 2024. " * 40
+
+
+class MockResponse:
+    """urequests.Response with the body behind a stream, like on the device."""
+
+    def __init__(self, body, status_code=200):
+        self.raw = io.BytesIO(body)
+        self.status_code = status_code
+
+    def json(self):
+        return json.loads(self.raw.read())
+
+    def close(self):
+        self.raw = None
+
+
+class MockUrequests(types.ModuleType):
+    """Answers every /gear/{id} GET with a detailed gear document."""
+
+    def __init__(self):
+        super().__init__('urequests')
+        self.requests = 0
+
+    def get(self, url, headers=None):
+        self.requests += 1
+        gear_id = url.rsplit('/', 1)[1]
+        body = json.dumps({
+            "id": gear_id,
+            "primary": False,
+            "name": f"Bike {gear_id} with a rather long name",
+            "resource_state": 3,
+            "distance": 1000.0 * self.requests,
+            "brand_name": "Canyon",
+            "model_name": "Ultimate CF SL",
+            "description": DESCRIPTION,
+        }).encode()
+        return MockResponse(body)
+
+
+def install_mocks():
+    """Register the device-only modules the firmware imports."""
+    urequests = MockUrequests()
+    sys.modules['urequests'] = urequests
+
+    network = types.ModuleType('network')
+    network.STA_IF = 0
+    sys.modules['network'] = network
+
+    sys.modules['uasyncio'] = asyncio
+
+    credentials = types.ModuleType('credentials')
+    credentials.WIFI_SSID = credentials.WIFI_PASSWORD = ''
+    credentials.GEAR_ID = 'b0'
+    sys.modules['credentials'] = credentials
+
+    # The firmware prints gc.mem_free() deltas, tracemalloc measures here
+    if not hasattr(gc, 'mem_free'):
+        gc.mem_free = lambda: 0
+    return urequests
+
+
+def main():
+    urequests = install_mocks()
+    import strava_token
+    strava_token.get_access_token = lambda force=False: 'benchmark'
+    import d1_mini_gear_check
+
+    print("=== fetch_gear_record memory ===")
+    devnull = open(os.devnull, 'w')
+    for count in (1, 4, 16, 64):
+        gear_ids = [f"b{index}" for index in range(count)]
+        urequests.requests = 0
+        tracemalloc.start()
+        with contextlib.redirect_stdout(devnull):
+            # The gear loop of refresh_gear(), without the awaits
+            records = [d1_mini_gear_check.fetch_gear_record(gear_id)[0] for gear_id in gear_ids]
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if len(records) != count or urequests.requests != count:
+            raise SystemExit(f"Expected {count} records, got {len(records)}")
+        print(f"{count:3d} gear: peak {peak:6d} B, working {peak - kept:5d} B, "
+              f"records {kept:6d} B ({kept / count:5.1f} B/gear)")
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
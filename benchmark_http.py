@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Benchmark of the pooled StravaClient against one-shot requests.get calls.
+
+Starts a local stub server that answers every GET with a small gear JSON
+document and counts the TCP connections and requests it receives. The
+stub sends an ETag and answers matching If-None-Match with 304, so the
+response cache is measured both for fresh hits and for revalidation. The stub speaks HTTPS
+with a throwaway self-signed certificate when the openssl CLI is available,
+plain HTTP otherwise.
+
+    python benchmark_http.py [requests]
+"""
+
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+
+# Every request passes its own token, so strava_token never reads the
+# credentials; a stub lets the benchmark run on a checkout without them
+try:
+    import credentials
+except ImportError:
+    sys.modules['credentials'] = types.ModuleType('credentials')
+
+from strava_cache import ResponseCache
+from strava_client import StravaClient
+from strava_ratelimit import RateLimiter
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+GEAR_JSON = b'{"id": "b1234567", "name": "Road Bike", "distance": 1234567.0}'
+ETAG = '"gear-v1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like www.strava.com
+    connections = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        with StubHandler.lock:
+            StubHandler.requests += 1
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(GEAR_JSON)))
+        self.end_headers()
+        self.wfile.write(GEAR_JSON)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_certificate(directory):
+    """Create a self-signed certificate, or return None without openssl."""
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                        '-keyout', key, '-out', cert, '-days', '1', '-subj', '/CN=localhost'],
+                       check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return cert, key
+
+
+def start_server(directory):
+    """Start the stub server in a thread and return (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    scheme = 'http'
+    certificate = make_certificate(directory)
+    if certificate:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*certificate)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+
+def run(label, fetch, count):
+    """Call fetch() count times and print throughput and connections used."""
+    StubHandler.connections = 0
+    StubHandler.requests = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        fetch()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {count / elapsed:8.1f} req/s "
+          f"{elapsed / count * 1000:7.2f} ms/req "
+          f"{StubHandler.connections:5d} connections "
+          f"{StubHandler.requests:5d} requests")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        server, base_url = start_server(directory)
+        url = f"{base_url}/gear/b1234567"
+        headers = {'Authorization': 'Bearer benchmark'}
+
+        # The stub sends no X-RateLimit headers, so the limiter would count
+        # against Strava's default 100 requests per 15 minutes and stall
+        limiter = RateLimiter(limits=(sys.maxsize, sys.maxsize))
+
+        print(f"=== {count} GETs against {base_url} ===")
+        run('requests.get', lambda: requests.get(url, headers=headers, verify=False).json(), count)
+        with StravaClient(base_url=base_url, verify=False, cache=False,
+                          rate_limiter=limiter) as client:
+            run('StravaClient', lambda: client.get('/gear/b1234567', access_token='benchmark').json(), count)
+
+        # Streams are served from the cache within their TTL, gear has no
+        # TTL and is revalidated with If-None-Match every time
+        cache = ResponseCache(os.path.join(directory, 'cache.db'))
+        with StravaClient(base_url=base_url, verify=False, cache=cache,
+                          rate_limiter=limiter) as client:
+            run('cache (fresh)', lambda: client.get('/activities/1/streams', access_token='benchmark').json(), count)
+            run('cache (304)', lambda: client.get('/gear/b1234567', access_token='benchmark').json(), count)
+        print(f"Cache: {cache.describe()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Host-side benchmark for json_stream.extract_fields.
+
+Parses a /gear/{id} answer the way urequests' response.json() does (whole
+body read into memory, then json.loads) and with the streaming extractor,
+and reports peak traced memory and time per parse. The extractor must
+return the same values as json.loads, this is checked first. A larger
+document with a long description shows how the peak of response.json()
+grows with the body while the extractor's stays flat. The description is
+tried both after the wanted keys, where the extractor stops early, and
+before them, where it has to read through it.
+
+    python benchmark_json_stream.py [parses]
+"""
+
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+import display_sim
+display_sim.install()
+
+import json_stream
+
+GEAR = {
+    "id": "b1234567",
+    "primary": True,
+    "name": "Road Bike é \"Nr. 1\"",
+    "nickname": "Road Bike",
+    "resource_state": 3,
+    "retired": False,
+    "distance": 1234567.0,
+    "converted_distance": 1234.6,
+    "brand_name": "Canyon",
+    "model_name": "Ultimate CF SL",
+    "frame_type": 3,
+    "description": "",
+    "weight": 8.2,
+}
+KEYS = ('distance', 'name')
+
+
+def response_json(body):
+    """What response.json() does on the device."""
+    return json.loads(io.BytesIO(body).read())
+
+
+def extract(body):
+    return json_stream.extract_fields(io.BytesIO(body), KEYS)
+
+
+def measure(parse, body, count):
+    """Return (peak traced bytes of one parse, seconds per parse)."""
+    tracemalloc.start()
+    parse(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(count):
+        parse(body)
+    return peak, (time.perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    description = "Commuter, new chain 2024. " * 80
+    long_gear = dict(GEAR, description=description)
+    # Same fields, the description first, so it lies before the wanted keys
+    leading_gear = dict(description=description)
+    leading_gear.update((key, value) for key, value in GEAR.items() if key != 'description')
+
+    print(f"=== /gear/{{id}} parse, {count} parses ===")
+    for label, gear in (("gear", GEAR), ("gear + long description", long_gear),
+                        ("gear + long description first", leading_gear)):
+        body = json.dumps(gear).encode()
+        expected = {key: gear[key] for key in KEYS}
+        if extract(body) != expected:
+            raise SystemExit(f"Extractor mismatch for {label}: {extract(body)!r}")
+
+        full_peak, full_time = measure(response_json, body, count)
+        stream_peak, stream_time = measure(extract, body, count)
+        print(f"{label} ({len(body)} bytes):")
+        print(f"  response.json()  peak {full_peak:7d} B  {full_time * 1e6:8.1f} us/parse")
+        print(f"  extract_fields   peak {stream_peak:7d} B  {stream_time * 1e6:8.1f} us/parse")
+
+
+if __name__ == "__main__":
+    main()
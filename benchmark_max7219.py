@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Host-side benchmark for the MAX7219 frame push.
+
+Runs Matrix8x8.show() against a fake SPI bus and chip select that count
+writes and bytes, and measures allocations per frame with tracemalloc.
+The pre-optimisation show() is kept here as a reference so both paths
+can be compared on the same machine. A replay of the count-up animation
+from d1_mini_gear_check shows how many digit rows the dirty-row tracking
+skips on real content.
+
+    python benchmark_max7219.py [frames]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import display_sim
+display_sim.install()
+
+import max7219
+from custom_font import draw_text
+
+
+def legacy_show(display):
+    """Frame push as it was before the preallocated row buffers."""
+    for y in range(8):
+        display.cs(0)
+        for m in range(display.num):
+            display.spi.write(bytearray([max7219._DIGIT0 + y, display.buffer[(y * display.num) + m]]))
+        display.cs(1)
+
+
+def full_show(display):
+    """Current show() with the shadow copy invalidated, i.e. every row sent."""
+    display.invalidate()
+    display.show()
+
+
+def run(label, show, display, spi, frames):
+    """Push `frames` frames and print per-frame cost."""
+    # Vary the content so every frame carries real data
+    for i in range(len(display.buffer)):
+        display.buffer[i] = (i * 37) & 0xFF
+
+    spi.reset()
+    start = time.perf_counter()
+    for _ in range(frames):
+        show(display)
+    elapsed = time.perf_counter() - start
+    writes, sent = spi.writes, spi.bytes
+
+    # Peak traced memory of a single frame: transient buffers show up here
+    # even though they are garbage again by the time show() returns.
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    show(display)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    print(f"{label:<10} {elapsed / frames * 1e6:9.1f} us/frame "
+          f"{frames / elapsed:9.0f} fps "
+          f"{writes / frames:6.1f} writes/frame "
+          f"{sent / frames:6.1f} bytes/frame "
+          f"{peak:6d} B peak alloc/frame")
+
+
+def animation(display, spi, old_value, new_value, steps=100):
+    """Replay the count-up from animate_update and report SPI traffic."""
+    display.invalidate()
+    display.reset_stats()
+    spi.reset()
+    for i in range(steps):
+        current = old_value + (new_value - old_value) * i / steps
+        display.fill(0)
+        draw_text(display, f"{int(current):04d}", 0, 0, 'large')
+        display.show()
+    total = display.rows_sent + display.rows_skipped
+    print(f"count-up {old_value:.1f} -> {new_value:.1f}: "
+          f"{display.rows_sent} rows sent, {display.rows_skipped} skipped "
+          f"({100 * display.rows_skipped / total:.0f}%), "
+          f"{spi.bytes} bytes vs {steps * 8 * 2 * display.num} unfiltered")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    spi = display_sim.FakeSPI()
+    display = max7219.Matrix8x8(spi, display_sim.FakeCS(), 4)
+
+    print(f"=== MAX7219 frame push, {display.num} modules, {frames} frames ===")
+    run('legacy', legacy_show, display, spi, frames)
+    run('full', full_show, display, spi, frames)
+    run('dirty', max7219.Matrix8x8.show, display, spi, frames)
+    animation(display, spi, 0.0, 1234.5)
+    animation(display, spi, 1234.5, 1276.3)
+
+    # Count every bytearray created during a frame, this is the garbage the
+    # MicroPython GC has to collect between frames on the device.
+    created = [0]
+    real_bytearray = bytearray
+
+    def counting_bytearray(*args):
+        created[0] += 1
+        return real_bytearray(*args)
+
+    max7219.bytearray = counting_bytearray
+    globals()['bytearray'] = counting_bytearray
+    try:
+        for label, show in (('legacy', legacy_show), ('full', full_show)):
+            created[0] = 0
+            show(display)
+            print(f"{label:<10} {created[0]:3d} buffers allocated per frame")
+    finally:
+        del max7219.bytearray
+        globals()['bytearray'] = real_bytearray
+
+
+if __name__ == "__main__":
+    main()
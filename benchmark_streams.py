@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Benchmark of the NumPy stream summaries on a synthetic multi-hour ride.
+
+Builds a key_by_type streams response like Strava's, with dropouts in the
+heart rate and power streams, and times conversion into ActivityStreams
+plus every summary against a plain-Python normalized power.
+
+    python benchmark_streams.py [hours]
+"""
+
+import random
+import sys
+import time
+
+from activity_streams import (ActivityStreams, convert_speed, moving_average,
+                              normalized_power, time_in_zones)
+
+
+def synthetic_streams(seconds):
+    """Return a streams response with 1 Hz samples and ~1% missing values."""
+    rng = random.Random(42)
+    power = [max(0, int(200 + 80 * rng.gauss(0, 1))) for _ in range(seconds)]
+    heartrate = [int(140 + 20 * rng.random()) for _ in range(seconds)]
+    for data in (power, heartrate):
+        for i in rng.sample(range(seconds), seconds // 100):
+            data[i] = None
+    return {
+        'time': {'data': list(range(seconds))},
+        'watts': {'data': power},
+        'heartrate': {'data': heartrate},
+        'velocity_smooth': {'data': [8 + rng.random() * 2 for _ in range(seconds)]},
+        'cadence': {'data': [int(85 + rng.random() * 10) for _ in range(seconds)]},
+        'temp': {'data': [21] * seconds},
+    }
+
+
+def python_normalized_power(raw, window=30):
+    """Reference normalized power with list operations, sample by sample."""
+    power = [value or 0 for value in raw['watts']['data']]
+    rolling = []
+    total = sum(power[:window])
+    rolling.append(total / window)
+    for i in range(window, len(power)):
+        total += power[i] - power[i - window]
+        rolling.append(total / window)
+    return (sum(value ** 4 for value in rolling) / len(rolling)) ** 0.25
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<24} {(time.perf_counter() - start) * 1000:8.2f} ms")
+    return result
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    raw = synthetic_streams(int(hours * 3600))
+    print(f"=== {len(raw['time']['data'])} samples ({hours:g} h) ===")
+
+    streams = timed('ActivityStreams', lambda: ActivityStreams.from_strava(raw))
+    fast = timed('normalized_power', lambda: normalized_power(streams))
+    timed('time_in_zones (HR)', lambda: time_in_zones(streams, 'heartrate', [114, 133, 152, 171]))
+    timed('time_in_zones (power)', lambda: time_in_zones(streams, 'watts', [138, 188, 225, 263, 300, 375]))
+    timed('moving_average 300 s', lambda: moving_average(streams.resample('watts'), 300))
+    timed('convert_speed km/h', lambda: convert_speed(streams.get('velocity_smooth')))
+    slow = timed('python normalized power', lambda: python_normalized_power(raw))
+    print(f"Normalized power: numpy {fast:.1f} W, python {slow:.1f} W")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,24 @@
 #!/usr/bin/python
 # -*- coding:utf-8 -*-
 
-import requests
+from strava_client import default_client
 import urllib3
-import credentials as auth
+import strava_token
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 def get_gear_distance(gear_id="b14697016"):
     """Get the distance for a specific piece of Strava gear."""
-    # Strava API URLs
-    auth_url = "https://www.strava.com/oauth/token"
     gear_url = f"https://www.strava.com/api/v3/gear/{gear_id}"
 
-    # Get access token
-    payload = {
-        'client_id': auth.StravaCredentials['client_id'],
-        'client_secret': auth.StravaCredentials['client_secret'],
-        'refresh_token': auth.StravaCredentials['refresh_token'],
-        'grant_type': 'refresh_token'
-    }
-
     try:
         print('Requesting Token...')
-        res = requests.post(auth_url, data=payload, verify=False)
-        access_token = res.json()['access_token']
+        access_token = strava_token.get_access_token()
+        if not access_token:
+            return None
         
         # Get gear data
-        header = {'Authorization': f'Bearer {access_token}'}
-        gear_data = requests.get(gear_url, headers=header).json()
+        gear_data = default_client().get(gear_url, access_token=access_token).json()
         
         print("\n=== Gear Information ===")
         print(f"Gear ID: {gear_id}")
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Offline font compiler for the MAX7219 display.
+
+Packs the glyph tables from font_source.py into font_data.py, a module
+holding a single bytes blob plus a character index per font. On the
+D1 Mini custom_font.py reads glyphs as zero-copy memoryview slices of
+that blob, so no per-glyph lists or dicts are built at import.
+
+    python compile_font.py [output.py]
+
+For the smallest footprint, cross-compile the result before uploading:
+
+    mpy-cross font_data.py
+"""
+
+import sys
+
+import font_source
+
+GLYPH_HEIGHT = 8
+
+# (name in font_data, table in font_source)
+FONTS = (
+    ('LARGE', font_source.LARGE_NUMBERS),
+    ('SMALL', font_source.SMALL_FONT),
+)
+
+
+def pack_font(name, table):
+    """Validate a font table and return (chars, packed bytes)."""
+    chars = ''
+    data = bytearray()
+    for char, bitmap in table.items():
+        if len(char) != 1:
+            raise ValueError(f"{name}: glyph key {char!r} must be a single character")
+        if len(bitmap) != GLYPH_HEIGHT:
+            raise ValueError(f"{name}: glyph {char!r} has {len(bitmap)} rows, expected {GLYPH_HEIGHT}")
+        for row in bitmap:
+            if not 0 <= row <= 0xFF:
+                raise ValueError(f"{name}: glyph {char!r} row {row} does not fit in a byte")
+        chars += char
+        data += bytes(bitmap)
+    return chars, bytes(data)
+
+
+def render_module(fonts):
+    """Return the source of font_data.py for the given font tables."""
+    lines = [
+        '"""',
+        'Packed font data for custom_font.py.',
+        '',
+        'Generated by compile_font.py from font_source.py - do not edit by hand.',
+        f'Every glyph is {GLYPH_HEIGHT} MONO_HLSB row bytes. Glyph i of a font starts at',
+        f'<FONT>_OFFSET + {GLYPH_HEIGHT} * i, where i is its position in <FONT>_CHARS.',
+        '"""',
+        '',
+    ]
+    offset = 0
+    glyphs = []
+    for name, table in fonts:
+        chars, data = pack_font(name, table)
+        lines.append(f'{name}_CHARS = {chars!r}')
+        lines.append(f'{name}_OFFSET = {offset}')
+        for i, char in enumerate(chars):
+            row_bytes = data[i * GLYPH_HEIGHT:(i + 1) * GLYPH_HEIGHT]
+            literal = ''.join(f'\\x{b:02x}' for b in row_bytes)
+            glyphs.append(f"    b'{literal}'  # {name} {char!r}")
+        offset += len(data)
+    lines.append('')
+    # Adjacent literals are joined by the compiler into a single bytes object
+    lines.append('DATA = (')
+    lines.extend(glyphs)
+    lines.append(')')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else 'font_data.py'
+    source = render_module(FONTS)
+    with open(output, 'w') as f:
+        f.write(source)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
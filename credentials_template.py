@@ -7,6 +7,15 @@ STRAVA_CLIENT_ID = "your_client_id"
 STRAVA_CLIENT_SECRET = "your_client_secret"
 STRAVA_REFRESH_TOKEN = "your_refresh_token"
 GEAR_ID = "your_bike_id"
+# GEAR_IDS = ["your_bike_id", "your_other_bike_id"]  # Optional, shown in turn
+# REFRESH_INTERVAL = 900  # Optional, seconds between gear refreshes
+
+# Optional display power settings
+# DAY_BRIGHTNESS = 1  # 0-15
+# NIGHT_BRIGHTNESS = 0  # 0-15
+# NIGHT_HOURS = (22, 7)  # Local hours the night starts and ends
+# UTC_OFFSET = 1  # Hours between local time and UTC
+# IDLE_TIMEOUT = 1800  # Seconds without activity before the display blanks, 0 (default) = never
 
 # WiFi settings
 WIFI_SSID = "your_wifi_name"
@@ -1,136 +1,43 @@
 """
 Custom font definitions for MAX7219 LED matrix display.
-Each character is defined as an 8x8 bitmap where 1 represents an ON pixel and 0 represents an OFF pixel.
+Each character is an 8x8 bitmap where 1 represents an ON pixel and 0 represents an OFF pixel.
+
+The glyphs are edited in font_source.py and packed into font_data.py by
+compile_font.py; this module only reads slices of the packed blob.
 """
 
-# Custom large number font (8x8 pixels per digit)
-LARGE_NUMBERS = {
-    '0': [
-        0b00111100,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b00111100
-    ],
-    '1': [
-        0b00011000,
-        0b00111000,
-        0b00011000,
-        0b00011000,
-        0b00011000,
-        0b00011000,
-        0b00011000,
-        0b01111110
-    ],
-    '2': [
-        0b00111100,
-        0b01100110,
-        0b00000110,
-        0b00001100,
-        0b00011000,
-        0b00110000,
-        0b01100000,
-        0b01111110
-    ],
-    '3': [
-        0b00111100,
-        0b01100110,
-        0b00000110,
-        0b00011100,
-        0b00000110,
-        0b00000110,
-        0b01100110,
-        0b00111100
-    ],
-    '4': [
-        0b00001100,
-        0b00011100,
-        0b00111100,
-        0b01101100,
-        0b01111110,
-        0b00001100,
-        0b00001100,
-        0b00001100
-    ],
-    '5': [
-        0b01111110,
-        0b01100000,
-        0b01100000,
-        0b01111100,
-        0b00000110,
-        0b00000110,
-        0b01100110,
-        0b00111100
-    ],
-    '6': [
-        0b00111100,
-        0b01100110,
-        0b01100000,
-        0b01111100,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b00111100
-    ],
-    '7': [
-        0b01111110,
-        0b00000110,
-        0b00001100,
-        0b00011000,
-        0b00110000,
-        0b00110000,
-        0b00110000,
-        0b00110000
-    ],
-    '8': [
-        0b00111100,
-        0b01100110,
-        0b01100110,
-        0b00111100,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b00111100
-    ],
-    '9': [
-        0b00111100,
-        0b01100110,
-        0b01100110,
-        0b01100110,
-        0b00111110,
-        0b00000110,
-        0b01100110,
-        0b00111100
-    ]
-}
+import framebuf
+import font_data
+
+_DATA = memoryview(font_data.DATA)
+_BLANK = memoryview(bytes(8))
+
+# Scratch glyph for blit(): FrameBuffer needs a writable buffer, so glyphs
+# that are not byte-aligned are copied here first instead of keeping one
+# FrameBuffer per character on the heap.
+_scratch = bytearray(8)
+_scratch_fb = framebuf.FrameBuffer(_scratch, 8, 8, framebuf.MONO_HLSB)
+
+def get_glyph(char, font_type='large'):
+    """Get the packed bitmap for a specific character.
 
-# Custom small font (5x8 pixels per character)
-SMALL_FONT = {
-    'A': [
-        0b00100000,
-        0b01010000,
-        0b10001000,
-        0b11111000,
-        0b10001000,
-        0b10001000,
-        0b10001000,
-        0b00000000
-    ],
-    'B': [
-        0b11110000,
-        0b10001000,
-        0b10001000,
-        0b11110000,
-        0b10001000,
-        0b10001000,
-        0b11110000,
-        0b00000000
-    ],
-    # Add more characters as needed
-}
+    Args:
+        char (str): The character to get the glyph for
+        font_type (str): 'large' for numbers, 'small' for text
+
+    Returns:
+        memoryview: 8 row bytes, or None if the character is unknown
+    """
+    if font_type == 'large':
+        index = font_data.LARGE_CHARS.find(char)
+        offset = font_data.LARGE_OFFSET
+    else:
+        index = font_data.SMALL_CHARS.find(char)
+        offset = font_data.SMALL_OFFSET
+    if index < 0 or len(char) != 1:
+        return None
+    offset += index * 8
+    return _DATA[offset:offset + 8]
 
 def get_char(char, font_type='large'):
     """Get the bitmap for a specific character.
@@ -140,16 +47,17 @@ def get_char(char, font_type='large'):
         font_type (str): 'large' for numbers, 'small' for text
         
     Returns:
-        list: List of bytes representing the character bitmap
+        memoryview: 8 bytes representing the character bitmap
     """
-    if font_type == 'large':
-        return LARGE_NUMBERS.get(char, [0] * 8)
-    else:
-        return SMALL_FONT.get(char, [0] * 8)
+    glyph = get_glyph(char, font_type)
+    return _BLANK if glyph is None else glyph
 
 def draw_char(display, char, x, y, font_type='large'):
     """Draw a character at the specified position.
     
+    Byte-aligned characters on the top row are ORed straight into the
+    display buffer, anything else is blitted with 0 as transparent key.
+    
     Args:
         display: MAX7219 display instance
         char (str): Character to draw
@@ -157,11 +65,18 @@ def draw_char(display, char, x, y, font_type='large'):
         y (int): Y position
         font_type (str): 'large' for numbers, 'small' for text
     """
-    bitmap = get_char(char, font_type)
-    for row, data in enumerate(bitmap):
-        for col in range(8):
-            if data & (1 << (7 - col)):
-                display.pixel(x + col, y + row, 1)
+    data = get_glyph(char, font_type)
+    if data is None:
+        return
+    num = display.num
+    if y == 0 and x & 7 == 0 and 0 <= x < 8 * num:
+        buf = display.buffer
+        col = x >> 3
+        for row in range(8):
+            buf[row * num + col] |= data[row]
+    else:
+        _scratch[:] = data
+        display.blit(_scratch_fb, x, y, 0)
 
 def draw_text(display, text, x, y, font_type='large'):
     """Draw text string at the specified position.
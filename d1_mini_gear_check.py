@@ -2,121 +2,206 @@ import urequests as requests
 import network
 import time
 import json
-import socket
+import gc
+import framebuf
+import uasyncio as asyncio
 from machine import Pin, SPI, reset
-from time import sleep
-from credentials import WIFI_SSID, WIFI_PASSWORD, STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, STRAVA_REFRESH_TOKEN, GEAR_ID
+from credentials import WIFI_SSID, WIFI_PASSWORD
+import credentials
+import strava_token
+import json_stream
 from max7219 import Matrix8x8
-from custom_font import draw_text, draw_char  # Add this import
-import machine
+from animation import Animation, Player
+from odometer import Odometer
+from custom_font import draw_text, draw_char
 
 # Initialize SPI and display
 spi = SPI(1, baudrate=10000000)
 display = Matrix8x8(spi, Pin(15, Pin.OUT), 4)  # 4 modules
-display.brightness(1)  # Set maximum brightness (0-15)
 
-def setup_web_server():
-    """Setup a simple web server for remote control."""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.bind(('', 80))
-        s.listen(5)
-        s.setblocking(False)
-        
-        # Get and display IP address
-        wlan = network.WLAN(network.STA_IF)
-        ip = wlan.ifconfig()[0]
-        print(f"\nWeb server started on http://{ip}/")
-        print("You can visit this URL from any browser on your network to restart the device")
-        return s
-    except Exception as e:
-        print(f"Failed to setup web server: {e}")
-        return None
+# Gear shown on the display, GEAR_IDS in credentials.py lists several
+GEAR_IDS = getattr(credentials, 'GEAR_IDS', None) or (credentials.GEAR_ID,)
+SHORT_NAME_LENGTH = 16  # Characters of the gear name kept per record
+ROTATE_INTERVAL = 30  # Seconds each gear stays on the display
+REFRESH_INTERVAL = getattr(credentials, 'REFRESH_INTERVAL', 15 * 60)  # Seconds between gear refreshes
+
+# Display power: dimmed at night, optionally blanked when idle, woken by web requests
+DAY_BRIGHTNESS = getattr(credentials, 'DAY_BRIGHTNESS', 1)  # 0-15
+NIGHT_BRIGHTNESS = getattr(credentials, 'NIGHT_BRIGHTNESS', 0)  # 0-15
+NIGHT_HOURS = getattr(credentials, 'NIGHT_HOURS', (22, 7))  # Local hours the night starts and ends
+UTC_OFFSET = getattr(credentials, 'UTC_OFFSET', 0)  # Hours, the clock is synced to UTC
+IDLE_TIMEOUT = getattr(credentials, 'IDLE_TIMEOUT', 0)  # Seconds without activity before blanking, 0 = never
+POWER_CHECK_INTERVAL = 10  # Seconds between checks of the power policy
+
+display.brightness(DAY_BRIGHTNESS)  # Set brightness (0-15)
+
+FRAME_PERIOD = 20  # ms per frame of the count-up and sweep animations
+SCROLL_PERIOD = 50  # ms per pixel of scrolled text
+
+# Plays every animation and keeps the frame statistics
+player = Player()
+
+# Rolling digits of the count-up animations
+odometer = Odometer(display)
+
+# Rendered strip per scrolled text, reused while the gear names stay the same
+scroll_strips = {}
+SCROLL_STRIPS = len(GEAR_IDS) + 1  # Gear names plus the IP banner
 
-def check_for_restart_request(server_socket):
-    """Check for incoming web requests to restart."""
-    if server_socket is None:
+# Latest (id, km, short_name) records and the distance last shown per gear
+gear_records = []
+shown_distances = {}
+
+# 'on', 'dim' or 'off', and when something last happened worth showing
+power_state = 'on'
+last_activity = time.ticks_ms()
+
+# Set while the restart animation plays, the display loop holds off
+restarting = False
+
+def is_night():
+    """Whether the local time is within NIGHT_HOURS, False while the clock is unset."""
+    local = time.localtime(time.time() + UTC_OFFSET * 3600)
+    if local[0] < 2024:
+        return False
+    start, end = NIGHT_HOURS
+    if start > end:
+        return local[3] >= start or local[3] < end
+    return start <= local[3] < end
+
+def update_power(activity=False):
+    """Apply the power policy to the display, waking it right away on activity.
+
+    A blanked display stays off until the next activity, a web request or
+    a distance that grew.
+    """
+    global power_state, last_activity
+    if activity:
+        last_activity = time.ticks_ms()
+    elif power_state == 'off':
         return
-        
+    
+    if IDLE_TIMEOUT and time.ticks_diff(time.ticks_ms(), last_activity) >= IDLE_TIMEOUT * 1000:
+        state = 'off'
+    elif is_night():
+        state = 'dim'
+    else:
+        state = 'on'
+    if state == power_state:
+        return
+    
+    if state == 'off':
+        display.power_off()
+    else:
+        display.brightness(NIGHT_BRIGHTNESS if state == 'dim' else DAY_BRIGHTNESS)
+        if not display.powered:
+            display.power_on()
+    print(f"Display {power_state} -> {state}")
+    power_state = state
+
+def describe_power(state):
+    if state == 'off':
+        return f"off, blanked after {IDLE_TIMEOUT // 60} min without activity"
+    if state == 'dim':
+        return f"dimmed for the night, brightness {display.intensity}"
+    return f"on, brightness {display.intensity}"
+
+def status_page(previous_power=None):
+    """HTML status page with the current distance of each gear and the display power state."""
+    page = b"<html><body style='font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 20px;'>"
+    page += b"<h1>Strava Gear km Display</h1>"
+    shown = False
     try:
-        conn, addr = server_socket.accept()
-        print(f"Received connection from: {addr}")
-        
-        try:
-            # Set blocking mode temporarily for reliable reading
-            conn.setblocking(True)
-            
-            # Read and print the request for debugging
-            request = conn.recv(1024)
-            request_str = request.decode()
-            print("Received request:", request_str)
-            
-            # Check if this is a restart request
-            if 'restart' in request_str.lower():
-                # Send restart response
-                response = b"HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n\r\nRestarting device..."
-                conn.send(response)
-                print("Response sent")
-                conn.close()
-                print("Connection closed")
-                
-                # Now restart with animation
-                print("Starting restart sequence...")
-                scroll_text("Updating...")  # Use scroll effect for "Updating..."
-                sleep(0.5)  # Short pause after scrolling
-                print("Calling reset()...")
-                machine.reset()
-            else:
-                # Get current distance from file
-                try:
-                    current_distance = load_last_distance()
-                    distance_str = f"{current_distance:.1f}km" if current_distance is not None else "Unknown"
-                except:
-                    distance_str = "Unknown"
-                
-                # Send normal response with current distance
-                response = b"HTTP/1.0 200 OK\r\nContent-Type: text/html\r\n\r\n"
-                response += b"<html><body style='font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 20px;'>"
-                response += b"<h1>Strava Gear km Display</h1>"
-                response += f"<h2>Current Distance: {distance_str}</h2>".encode()
-                response += b"<p>To restart the device, visit: <a href='/restart'>/restart</a></p>"
-                response += b"</body></html>"
-                conn.send(response)
-                conn.close()
-                
-        except Exception as e:
-            print(f"Error handling request: {e}")
-            try:
-                conn.close()
-            except:
-                pass
-            
-    except OSError as e:  # No connection waiting
-        if str(e) != '[Errno 11] EAGAIN':  # Only print unexpected errors
-            print(f"Connection error: {e}")
+        for gear_id, distance in load_last_distances():
+            page += f"<h2>{gear_id}: {distance:.1f}km</h2>".encode()
+            shown = True
+    except:
         pass
+    if not shown:
+        page += b"<h2>Current Distance: Unknown</h2>"
+    page += f"<p>Display: {describe_power(power_state)}</p>".encode()
+    if previous_power and previous_power != power_state:
+        page += f"<p>Woken by this request, was {describe_power(previous_power)}</p>".encode()
+    page += f"<p>Animations: {player.describe()}</p>".encode()
+    page += b"<p>To restart the device, visit: <a href='/restart'>/restart</a></p>"
+    page += b"</body></html>"
+    return page
+
+async def handle_client(reader, writer):
+    """Answer one web request: /restart restarts the device, anything else shows the status page."""
+    restart = False
+    # Any request wakes the display before it is answered
+    previous_power = power_state
+    update_power(activity=True)
+    try:
+        request_line = await reader.readline()
+        print("Received request:", request_line)
+        # Skip the headers, only the request line matters
+        while True:
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+        
+        if b'restart' in request_line.lower():
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n\r\nRestarting device...")
+            restart = True
+        else:
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/html\r\n\r\n")
+            writer.write(status_page(previous_power))
+        await writer.drain()
+    except Exception as e:
+        print(f"Error handling request: {e}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    
+    if restart:
+        # Now restart with animation
+        print("Starting restart sequence...")
+        await restart_device()
 
-def restart_device():
-    """Restart the D1 Mini."""
-    scroll_text("Updating...")  # Update this function too for consistency
-    sleep(0.5)
+async def restart_device():
+    """Scroll a notice, then restart the D1 Mini."""
+    global restarting
+    restarting = True
+    await play_frames(scroll_frames("Updating..."))
+    await asyncio.sleep_ms(500)
     reset()
 
-def save_last_distance(distance):
-    """Save the last known distance to a file."""
+def save_last_distances(records):
+    """Save the last known distance of each gear record to a file."""
     try:
         with open('last_distance.txt', 'w') as f:
-            f.write(str(distance))
+            for gear_id, distance, _ in records:
+                f.write(f"{gear_id} {distance}\n")
     except:
         print("Could not save distance")
 
-def load_last_distance():
-    """Load the last known distance from file."""
+def load_last_distances():
+    """Yield (gear_id, distance) pairs from the file, one line at a time.
+
+    A file written by the single-gear firmware holds just a number, it is
+    read as the distance of the first gear.
+    """
     try:
         with open('last_distance.txt', 'r') as f:
-            return float(f.read().strip())
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    yield parts[0], float(parts[1])
+                elif len(parts) == 1:
+                    yield GEAR_IDS[0], float(parts[0])
     except:
-        return None
+        return
+
+def load_last_distance(gear_id=None):
+    """Load the last known distance of a gear (the first one by default) from file."""
+    if gear_id is None:
+        gear_id = GEAR_IDS[0]
+    for stored_id, distance in load_last_distances():
+        if stored_id == gear_id:
+            return distance
+    return None
 
 def display_text(text):
     """Display text statically on the LED matrix displays."""
@@ -129,31 +214,52 @@ def display_text(text):
         display.text(text, 0, 0)
     display.show()
 
-def animate_update(old_value, new_value):
-    """Animate the update from old value to new value."""
+def run_frames(frames):
+    """Play an animation generator in place, sleeping the ms each frame yields."""
+    for wait in frames:
+        time.sleep_ms(wait)
+
+async def play_frames(frames):
+    """Play an animation generator as a task, other tasks run between frames."""
+    for wait in frames:
+        await asyncio.sleep_ms(wait)
+
+def update_frames(old_value, new_value):
+    """Frames of the update from old value to new value, yields ms to wait."""
     # First, show the difference with a + sign
     difference = new_value - old_value
     if difference > 0.1:  # Only animate if there's at least 0.1km increase
         # Show difference as whole number
         diff_text = f"+{int(difference)}"
         display_text(diff_text)
-        sleep(2)  # Show the difference for 2 seconds
+        yield 2000  # Show the difference for 2 seconds
         
         # Now animate counting up from old to new value
-        steps = 100  # Increased to 100 steps for maximum smoothness
-        step_size = difference / steps
-        for i in range(steps):  # Don't include the final step
-            current = old_value + (step_size * i)
-            display_text(f"{int(current):04d}")  # Show 4 digits with leading zeros
-            sleep(0.02)  # Decreased to 20ms for ultra-smooth animation
-        # Show final value with decimal
-        display_text(f"{new_value:.1f}km")
+        yield from count_up_frames(new_value, old_value)
     else:
         # If no change or negative change, just show new value
         display_text(f"{new_value:.1f}km")
 
-def scroll_text(text, delay=0.05):
-    """Scroll text across the LED matrix displays."""
+def animate_update(old_value, new_value):
+    """Animate the update from old value to new value."""
+    run_frames(update_frames(old_value, new_value))
+
+def play(animation):
+    """Play an animation on its frame deadlines, yields ms to wait."""
+    dropped = player.dropped
+    yield from player.frames(animation)
+    if player.dropped > dropped:
+        print(f"Animation dropped {player.dropped - dropped} of {animation.frames} frames ({player.describe()})")
+
+def scroll_frames(text, delay=SCROLL_PERIOD / 1000):
+    """Frames of text scrolling across the displays, yields ms to wait.
+
+    The text is rendered once, with a blank display width on either side,
+    into a strip that is kept in scroll_strips, so rotating through the
+    same gear names does not allocate it again. Every frame then copies a
+    32 pixel window of the strip into the display buffer, shifting the
+    bytes when the window is not byte-aligned.
+    """
     # Clear the display first
     display.fill(0)
     display.show()
@@ -161,12 +267,42 @@ def scroll_text(text, delay=0.05):
     # Get the text width
     text_width = len(text) * 8  # Each character is typically 8 pixels wide
     
-    # Scroll the text
-    for i in range(32 + text_width):
-        display.fill(0)  # Clear display
-        display.text(text, 32 - i, 0)  # Keep consistent with static text position
+    # Render ahead: blank, text, blank
+    row_bytes = (32 + text_width + 32) // 8
+    strip = scroll_strips.get(text)
+    if strip is None:
+        if len(scroll_strips) >= SCROLL_STRIPS:
+            scroll_strips.clear()
+        strip = bytearray(8 * row_bytes)
+        framebuf.FrameBuffer(strip, 8 * row_bytes, 8, framebuf.MONO_HLSB).text(text, 32, 0)
+        scroll_strips[text] = strip
+    view = memoryview(strip)
+    buffer = display.buffer
+    num = display.num
+    
+    def render(i):
+        # Window i..i+31 starts at bit i % 8 of byte i // 8 of each row
+        offset = i >> 3
+        shift = i & 7
+        if shift:
+            back = 8 - shift
+            for y in range(8):
+                row = y * num
+                for x in range(num):
+                    buffer[row + x] = ((strip[offset + x] << shift) | (strip[offset + x + 1] >> back)) & 0xFF
+                offset += row_bytes
+        else:
+            for y in range(8):
+                buffer[y * num:(y + 1) * num] = view[offset:offset + num]
+                offset += row_bytes
         display.show()
-        sleep(delay)
+    
+    # Scroll the text
+    yield from play(Animation(32 + text_width, int(delay * 1000), render))
+
+def scroll_text(text, delay=SCROLL_PERIOD / 1000):
+    """Scroll text across the LED matrix displays."""
+    run_frames(scroll_frames(text, delay))
 
 def connect_wifi():
     """Connect to WiFi network."""
@@ -209,25 +345,10 @@ def connect_wifi():
         return True
 
 def get_strava_token():
-    """Get a fresh Strava access token."""
-    auth_url = "https://www.strava.com/oauth/token"
-    payload = {
-        'client_id': STRAVA_CLIENT_ID,
-        'client_secret': STRAVA_CLIENT_SECRET,
-        'refresh_token': STRAVA_REFRESH_TOKEN,
-        'grant_type': 'refresh_token'
-    }
-    
-    try:
-        response = requests.post(auth_url, json=payload)
-        token_data = response.json()
-        response.close()
-        return token_data.get('access_token')
-    except Exception as e:
-        print('Token Error:', e)
-        return None
+    """Get a Strava access token, reusing the cached one until it expires."""
+    return strava_token.get_access_token()
 
-def get_gear_distance():
+def get_gear_distance(gear_id):
     """Get the distance and name for the specified gear."""
     try:
         # Get access token
@@ -236,15 +357,35 @@ def get_gear_distance():
             return None, None
             
         # Get gear data
-        gear_url = f"https://www.strava.com/api/v3/gear/{GEAR_ID}"
+        gear_url = f"https://www.strava.com/api/v3/gear/{gear_id}"
         headers = {'Authorization': f'Bearer {access_token}'}
         
         response = requests.get(gear_url, headers=headers)
-        gear_data = response.json()
+        if response.status_code == 401:
+            # Cached token was revoked or the clock is off, refresh once
+            response.close()
+            strava_token.invalidate()
+            access_token = get_strava_token()
+            if not access_token:
+                return None, None
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = requests.get(gear_url, headers=headers)
+        if response.status_code != 200:
+            # A 429, 5xx or 404 body has no distance, keep the last known one
+            print('Gear request failed with status', response.status_code)
+            response.close()
+            return None, None
+        # Stream the body instead of response.json(), only two fields are needed
+        gc.collect()
+        free_before = gc.mem_free()
+        gear_data = json_stream.extract_fields(response.raw, ('distance', 'name'))
         response.close()
+        print(f"Gear parse used {free_before - gc.mem_free()} bytes of heap")
+        if 'distance' not in gear_data:
+            return None, None
         
         # Get distance in kilometers and gear name
-        distance_km = gear_data.get('distance', 0) / 1000
+        distance_km = gear_data['distance'] / 1000
         gear_name = gear_data.get('name', 'Unknown Gear')
         return distance_km, gear_name
         
@@ -252,41 +393,224 @@ def get_gear_distance():
         print('Error:', e)
         return None, None
 
-def animate_initial_value(value):
-    """Animate counting up to the initial value."""
+def fetch_gear_record(gear_id):
+    """Fetch one gear as a compact (id, km, short_name) record.
+
+    The parse result is dropped right away, so only the record stays on
+    the heap. A gear that cannot be fetched keeps its last known record,
+    from memory or from the distance file.
+
+    Returns:
+        tuple: (record or None, whether it was fetched from Strava)
+    """
+    distance, gear_name = get_gear_distance(gear_id)
+    gc.collect()
+    if distance is not None:
+        return (gear_id, distance, gear_name[:SHORT_NAME_LENGTH]), True
+    for record in gear_records:
+        if record[0] == gear_id:
+            return record, False
+    distance = load_last_distance(gear_id)
+    if distance is None:
+        return None, False
+    return (gear_id, distance, gear_id[:SHORT_NAME_LENGTH]), False
+
+async def reconnect_wifi():
+    """Reconnect a dropped WiFi connection, other tasks run while it waits."""
+    wlan = network.WLAN(network.STA_IF)
+    if wlan.isconnected():
+        return True
+    print('Reconnecting to WiFi network:', WIFI_SSID)
+    try:
+        wlan.active(True)
+        wlan.connect(WIFI_SSID, WIFI_PASSWORD)
+    except Exception as e:
+        print('WiFi connection error:', e)
+        return False
+    # Wait up to 10 seconds for connection
+    for _ in range(10):
+        if wlan.isconnected():
+            return True
+        await asyncio.sleep_ms(1000)
+    return wlan.isconnected()
+
+async def refresh_gear():
+    """Fetch the gear again over the existing connection and cached token.
+
+    Only one response is open at a time. Each urequests call still blocks,
+    but the other tasks run between two gear, so the web server and the
+    display wait for one request at most.
+    """
+    global gear_records
+    if not await reconnect_wifi():
+        return
+    records = []
+    fetched = 0
+    for gear_id in GEAR_IDS:
+        record, ok = fetch_gear_record(gear_id)
+        if record is not None:
+            records.append(record)
+        fetched += ok
+        await asyncio.sleep_ms(0)
+    if records:
+        gear_records = records
+    if fetched:
+        save_last_distances(records)
+
+def display_loop():
+    """Frames of the gear shown in turn, animating distances that grew.
+
+    Yields the ms until the next frame, run by display_task.
+    """
+    index = 0
+    while True:
+        if not gear_records:
+            yield 1000
+            continue
+        index %= len(gear_records)
+        gear_id, distance, short_name = gear_records[index]
+        shown = shown_distances.get(gear_id)
+        grew = shown is not None and distance - shown > 0.1
+        if grew:
+            update_power(activity=True)  # New kilometers are worth waking up for
+        elif not display.powered:
+            # Dark and nothing new, move on without drawing
+            index += 1
+            yield ROTATE_INTERVAL * 1000
+            continue
+        if len(gear_records) > 1:
+            yield from scroll_frames(short_name)
+        if grew:
+            yield from update_frames(shown, distance)
+        else:
+            display_text(f"{distance:.1f}km")
+        shown_distances[gear_id] = distance
+        index += 1
+        yield ROTATE_INTERVAL * 1000
+
+async def display_task():
+    """Render the display, giving way to the web server between frames."""
+    for wait in display_loop():
+        await asyncio.sleep_ms(wait)
+        while restarting:
+            await asyncio.sleep_ms(100)
+
+async def refresh_task():
+    """Poll Strava for new distances every REFRESH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL)
+        try:
+            await refresh_gear()
+        except Exception as e:
+            print('Refresh error:', e)
+
+async def power_task():
+    """Dim, blank and wake the display according to the power policy."""
+    while True:
+        update_power()
+        await asyncio.sleep(POWER_CHECK_INTERVAL)
+
+async def serve(ip_address):
+    """Start the web server, introduce the gear, then run the display and Strava polling tasks."""
+    global gear_records
+    await asyncio.start_server(handle_client, '0.0.0.0', 80)
+    print(f"\nWeb server started on http://{ip_address}/")
+    print("You can visit this URL from any browser on your network to restart the device")
+    
+    # Get distance and name of every gear, one request at a time
+    await refresh_gear()
+    
+    if gear_records:
+        # Introduce each gear, the IP address after the first one
+        for index, record in enumerate(gear_records):
+            await play_frames(intro_frames(record, ip_address if index == 0 else None))
+            shown_distances[record[0]] = record[1]
+    else:
+        # If error, keep showing last known distance if available
+        last_distance = load_last_distance()
+        if last_distance is not None:
+            display_text(f"{last_distance:.1f}km")
+        else:
+            print("Failed to get distance")
+            display_text("Error")
+    
+    # New distances show up without a reboot
+    asyncio.create_task(refresh_task())
+    asyncio.create_task(power_task())
+    await display_task()
+
+def intro_frames(record, ip_address=None):
+    """Frames introducing a gear: its name, then counting up to its distance."""
+    gear_id, distance, short_name = record
+    yield from scroll_frames(short_name)
+    yield 1000  # Pause after scrolling
+    
+    if ip_address:
+        # Show IP address
+        yield from scroll_frames(f"IP: {ip_address}")
+        yield 1000  # Pause after scrolling
+    
+    # Display last known distance immediately if available
+    last_distance = load_last_distance(gear_id)
+    if last_distance is not None:
+        yield from count_up_frames(last_distance)
+    
+    # Only animate if there's no stored value or if there's an actual increase
+    if last_distance is None:
+        yield from count_up_frames(distance)
+    elif distance - last_distance > 0.1:
+        yield from update_frames(last_distance, distance)
+    else:
+        display_text(f"{distance:.1f}km")
+    print(f"{short_name} Distance: {distance:.1f}km")
+
+def count_up_frames(value, start=0):
+    """Frames of counting up from start to a value, yields ms to wait."""
     steps = 100  # Increased to 100 steps for maximum smoothness
-    for i in range(steps):  # Don't include the final step
-        current = (value * i) / steps
-        display_text(f"{int(current):04d}")  # Show 4 digits with leading zeros
-        sleep(0.02)  # Decreased to 20ms for ultra-smooth animation
+    step_size = (value - start) / steps
+    
+    def render(i):
+        odometer.show(start + step_size * i)  # 4 rolling digits, only changed ones are redrawn
+    
+    # Whatever was shown before is overwritten digit by digit
+    odometer.reset()
+    yield from play(Animation(steps, FRAME_PERIOD, render))
     # Show final value with decimal
     display_text(f"{value:.1f}km")
 
-def startup_animation():
-    """Display a smooth startup animation."""
+def animate_initial_value(value):
+    """Animate counting up to the initial value."""
+    run_frames(count_up_frames(value))
+
+def startup_frames():
+    """Frames of the startup sweep, yields ms to wait."""
     # First clear the display
     display.fill(0)
     display.show()
     
-    # Sweep animation - light up each column from left to right
-    for x in range(32):  # Full width of 4 8x8 matrices
-        for y in range(8):  # Height of matrix
-            display.pixel(x, y, 1)
+    # Columns 0 to i are drawn in every frame, so skipped frames still sweep
+    def sweep_in(i):
+        display.fill_rect(0, 0, i + 1, 8, 1)
+        display.show()
+    
+    def sweep_out(i):
+        display.fill_rect(0, 0, i + 1, 8, 0)
         display.show()
-        sleep(0.02)  # Fast sweep
     
-    sleep(0.2)  # Brief pause when fully lit
+    # Sweep animation - light up each column from left to right
+    yield from play(Animation(32, FRAME_PERIOD, sweep_in))  # Full width of 4 8x8 matrices
+    yield 200  # Brief pause when fully lit
     
     # Sweep out animation - clear each column from left to right
-    for x in range(32):
-        for y in range(8):
-            display.pixel(x, y, 0)
-        display.show()
-        sleep(0.02)
+    yield from play(Animation(32, FRAME_PERIOD, sweep_out))
     
     # Show 0000 directly
     # display_text("0000")
 
+def startup_animation():
+    """Display a smooth startup animation."""
+    run_frames(startup_frames())
+
 def main():
     # Start with the startup animation
     startup_animation()
@@ -300,50 +624,8 @@ def main():
     wlan = network.WLAN(network.STA_IF)
     ip_address = wlan.ifconfig()[0]
     
-    # Setup web server for remote restart
-    server_socket = setup_web_server()
-    
-    # Get gear distance and name
-    distance, gear_name = get_gear_distance()
-    
-    if distance is not None and gear_name is not None:
-        # Show gear name first
-        scroll_text(f"{gear_name}")
-        sleep(1)  # Pause after scrolling
-        
-        # Show IP address
-        scroll_text(f"IP: {ip_address}")
-        sleep(1)  # Pause after scrolling
-        
-        # Display last known distance immediately if available
-        last_distance = load_last_distance()
-        if last_distance is not None:
-            animate_initial_value(last_distance)
-        
-        # Only animate if there's no stored value or if there's an actual increase
-        if last_distance is None:
-            animate_initial_value(distance)
-        elif distance - last_distance > 0.1:
-            animate_update(last_distance, distance)
-        else:
-            display_text(f"{distance:.1f}km")
-        
-        # Save the new distance
-        save_last_distance(distance)
-        print(f"Bike Distance: {distance:.1f}km")
-        
-        # Keep checking for restart requests without updating distance
-        while True:
-            check_for_restart_request(server_socket)
-            sleep(1)
-    else:
-        # If error, keep showing last known distance if available
-        last_distance = load_last_distance()
-        if last_distance is not None:
-            display_text(f"{last_distance:.1f}km")
-        else:
-            print("Failed to get distance")
-            display_text("Error")
+    # Web server, display and Strava polling run as tasks from here on
+    asyncio.run(serve(ip_address))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,509 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Host-side stand-ins for the MicroPython modules used by the display code.
+
+Lets max7219.py, custom_font.py and the d1_mini_gear_check animations run
+on a desktop Python, so the rendering pipeline can be benchmarked and
+regression-tested without flashing the D1 Mini.
+
+install() registers `micropython`, `framebuf` and `machine` stand-ins and
+adds the MicroPython-only ticks/sleep functions to `time`. The `machine`
+SPI and CS pin feed a model of the MAX7219 chain, which decodes the
+register writes into the frame the LEDs would show. Time runs on a
+virtual clock: sleep_ms() advances it instead of sleeping, and is where a
+frame gets recorded into a compact binary trace.
+
+    >>> import display_sim
+    >>> display_sim.install()
+    >>> import max7219
+    >>> from machine import Pin, SPI
+    >>> display = max7219.Matrix8x8(SPI(1), Pin(15, Pin.OUT), 4)
+    >>> display.text('1234', 0, 0); display.show()
+    >>> print(display_sim.board.chain.ascii())
+    >>> display_sim.board.trace.save('frames.bin')
+
+Plain counters without the chain model are FakeSPI and FakeCS.
+
+    python display_sim.py frames.bin    # print a recorded trace
+"""
+
+import struct
+import sys
+import time
+import types
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+
+# Classic 5x7 ASCII font, five columns per character from ' ' to '~', bit 0
+# is the top row. It stands in for MicroPython's built-in 8x8 font: same
+# cell size and drawing rules, simpler glyph shapes.
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462"
+    "3649552250" "0005030000" "001c224100" "0041221c00" "082a1c2a08" "08083e0808"
+    "0050300000" "0808080808" "0060600000" "2010080402" "3e5149453e" "00427f4000"
+    "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0814224100" "1414141414"
+    "0041221408" "0201510906" "324979413e" "7e1111117e" "7f49494936" "3e41414122"
+    "7f4141221c" "7f49494941" "7f09090101" "3e41415132" "7f0808087f" "00417f4100"
+    "2040413f01" "7f08142241" "7f40404040" "7f0204027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f"
+    "1f2040201f" "7f2018207f" "6314081463" "0304780403" "6151494543" "00007f4141"
+    "0204081020" "41417f0000" "0402010204" "4040404040" "0001020400" "2054545478"
+    "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "081454543c"
+    "7f08040478" "00447d4000" "2040443d00" "007f102844" "00417f4000" "7c04180478"
+    "7c08040478" "3844444438" "7c14141408" "081414187c" "7c08040408" "4854545420"
+    "043f444020" "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "0804081008"
+)
+_UNKNOWN = b"\x7f\x41\x41\x41\x7f"  # Box for characters outside the font
+
+def glyph_columns(char):
+    """The 8 column bytes of a character cell, one blank column on either side."""
+    code = ord(char) - 32
+    if 0 <= code < len(_FONT_5X7) // 5:
+        columns = _FONT_5X7[5 * code:5 * code + 5]
+    else:
+        columns = _UNKNOWN
+    return b"\x00" + columns + b"\x00\x00"
+
+
+class FrameBuffer:
+    """Pure-Python subset of framebuf.FrameBuffer (MONO_HLSB only)."""
+
+    def __init__(self, buffer, width, height, fmt, stride=None):
+        if fmt != MONO_HLSB:
+            raise ValueError("Only MONO_HLSB is supported")
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) & ~7 if stride is None else stride
+
+    def _set(self, x, y, col):
+        index = (y * self.stride + x) >> 3
+        mask = 0x80 >> (x & 7)
+        if col:
+            self.buffer[index] |= mask
+        else:
+            self.buffer[index] &= ~mask & 0xFF
+
+    def _get(self, x, y):
+        return 1 if self.buffer[(y * self.stride + x) >> 3] & (0x80 >> (x & 7)) else 0
+
+    def fill(self, col):
+        value = 0xFF if col else 0
+        buf = self.buffer
+        for i in range(len(buf)):
+            buf[i] = value
+
+    def pixel(self, x, y, col=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if col is None:
+            return self._get(x, y)
+        self._set(x, y, col)
+
+    def fill_rect(self, x, y, w, h, col):
+        for yy in range(max(y, 0), min(y + h, self.height)):
+            for xx in range(max(x, 0), min(x + w, self.width)):
+                self._set(xx, yy, col)
+
+    def hline(self, x, y, w, col):
+        self.fill_rect(x, y, w, 1, col)
+
+    def vline(self, x, y, h, col):
+        self.fill_rect(x, y, 1, h, col)
+
+    def rect(self, x, y, w, h, col):
+        self.hline(x, y, w, col)
+        self.hline(x, y + h - 1, w, col)
+        self.vline(x, y, h, col)
+        self.vline(x + w - 1, y, h, col)
+
+    def blit(self, fbuf, x, y, key=-1):
+        # Only the part of fbuf that lands on this buffer is visited, like
+        # the native implementation
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            ty = y + sy
+            for sx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                tx = x + sx
+                col = fbuf._get(sx, sy)
+                if col != key:
+                    self._set(tx, ty, col)
+
+    def scroll(self, dx, dy):
+        width, height = self.width, self.height
+        xs = range(width - 1, -1, -1) if dx > 0 else range(width)
+        ys = range(height - 1, -1, -1) if dy > 0 else range(height)
+        for y in ys:
+            for x in xs:
+                sx, sy = x - dx, y - dy
+                if 0 <= sx < width and 0 <= sy < height:
+                    self._set(x, y, self._get(sx, sy))
+
+    def line(self, x1, y1, x2, y2, col):
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        error = dx + dy
+        while True:
+            self.pixel(x1, y1, col)
+            if x1 == x2 and y1 == y2:
+                return
+            double = 2 * error
+            if double >= dy:
+                error += dy
+                x1 += sx
+            if double <= dx:
+                error += dx
+                y1 += sy
+
+    def text(self, string, x, y, col=1):
+        """Draw text in 8x8 cells, only set pixels are drawn like on the device."""
+        for char in string:
+            glyph = glyph_columns(char)
+            for column in range(8):
+                bits = glyph[column]
+                tx = x + column
+                if not bits or not 0 <= tx < self.width:
+                    continue
+                for row in range(8):
+                    if bits & (1 << row) and 0 <= y + row < self.height:
+                        self._set(tx, y + row, col)
+            x += 8
+
+
+# MAX7219 registers, as in max7219.py
+_NOOP = 0
+_DIGIT0 = 1
+_DECODEMODE = 9
+_INTENSITY = 10
+_SCANLIMIT = 11
+_SHUTDOWN = 12
+_DISPLAYTEST = 15
+
+
+class MAX7219Chain:
+    """Register model of daisy-chained MAX7219 modules.
+
+    Bytes written while CS is low are shifted through the chain; on the
+    rising edge of CS every module latches the 16-bit word it holds. Word m
+    of the last 2 * num bytes goes to module m, the module that shows
+    columns 8*m to 8*m+7 in Matrix8x8's buffer layout.
+    """
+
+    def __init__(self, num=4):
+        self.num = num
+        self.digits = bytearray(8 * num)  # Same layout as Matrix8x8.buffer
+        self.intensity = bytearray(num)
+        self.scan_limit = bytearray(num)
+        self.shutdown = bytearray(num)  # 0 = shut down, as after power-on
+        self.decode_mode = bytearray(num)
+        self.display_test = bytearray(num)
+        self._shift = bytearray()
+        self.latches = 0
+        self.register_writes = 0
+
+    def shift(self, data):
+        self._shift += data
+        del self._shift[:-2 * self.num]
+
+    def latch(self):
+        words = self._shift
+        self._shift = bytearray()
+        if len(words) < 2 * self.num:
+            return
+        self.latches += 1
+        for m in range(self.num):
+            register = words[2 * m] & 0x0F
+            data = words[2 * m + 1]
+            if register == _NOOP:
+                continue
+            self.register_writes += 1
+            if _DIGIT0 <= register < _DIGIT0 + 8:
+                self.digits[(register - _DIGIT0) * self.num + m] = data
+            elif register == _DECODEMODE:
+                self.decode_mode[m] = data
+            elif register == _INTENSITY:
+                self.intensity[m] = data & 0x0F
+            elif register == _SCANLIMIT:
+                self.scan_limit[m] = data & 0x07
+            elif register == _SHUTDOWN:
+                self.shutdown[m] = data & 0x01
+            elif register == _DISPLAYTEST:
+                self.display_test[m] = data & 0x01
+
+    def frame(self):
+        """What the LEDs show, in Matrix8x8.buffer layout."""
+        frame = bytearray(8 * self.num)
+        for m in range(self.num):
+            for y in range(8):
+                if self.display_test[m]:
+                    frame[y * self.num + m] = 0xFF
+                elif self.shutdown[m] and y <= self.scan_limit[m]:
+                    frame[y * self.num + m] = self.digits[y * self.num + m]
+        return bytes(frame)
+
+    def ascii(self, frame=None):
+        """The frame as 8 lines of '#' and '.'."""
+        return frame_ascii(self.frame() if frame is None else frame, self.num)
+
+
+def frame_ascii(frame, num):
+    lines = []
+    for y in range(8):
+        row = frame[y * num:(y + 1) * num]
+        lines.append(''.join('#' if byte & (0x80 >> bit) else '.' for byte in row for bit in range(8)))
+    return '\n'.join(lines)
+
+
+class Trace:
+    """Compact binary record of the frames shown by a chain.
+
+    The file starts with TRACE_MAGIC and the module count, then one record
+    per frame: timestamp in microseconds (uint32), intensity of module 0,
+    flags (bit 0: any module shut down, bit 1: display test) and the 8*num
+    frame bytes, 38 bytes per frame for four modules.
+    """
+
+    def __init__(self, num=4):
+        self.num = num
+        self.data = bytearray(TRACE_MAGIC + bytes((num,)))
+        self.frames = 0
+
+    def record(self, timestamp_us, chain):
+        flags = (0 if all(chain.shutdown) else 1) | (2 if any(chain.display_test) else 0)
+        self.data += _RECORD.pack(timestamp_us & 0xFFFFFFFF, chain.intensity[0], flags)
+        self.data += chain.frame()
+        self.frames += 1
+
+    def clear(self):
+        del self.data[len(TRACE_MAGIC) + 1:]
+        self.frames = 0
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.data)
+
+
+TRACE_MAGIC = b'M7219T1'
+_RECORD = struct.Struct('<IBB')
+
+
+def read_trace(data):
+    """Yield (timestamp_us, intensity, flags, frame) from trace bytes or a file path."""
+    if isinstance(data, str):
+        with open(data, 'rb') as f:
+            data = f.read()
+    if not data.startswith(TRACE_MAGIC):
+        raise ValueError("Not a display trace")
+    num = data[len(TRACE_MAGIC)]
+    offset = len(TRACE_MAGIC) + 1
+    size = _RECORD.size + 8 * num
+    while offset + size <= len(data):
+        timestamp, intensity, flags = _RECORD.unpack_from(data, offset)
+        yield timestamp, intensity, flags, bytes(data[offset + _RECORD.size:offset + size])
+        offset += size
+
+
+class VirtualClock:
+    """ticks_ms/sleep_ms stand-ins: real time spent computing plus virtual sleeps.
+
+    Sleeping advances the clock without waiting, so animations run at
+    full speed while the animation engine still sees real render times.
+    """
+
+    def __init__(self, on_sleep=None):
+        self._start = time.perf_counter_ns()
+        self.slept_us = 0
+        self.on_sleep = on_sleep
+
+    def ticks_us(self):
+        return (time.perf_counter_ns() - self._start) // 1000 + self.slept_us
+
+    def ticks_ms(self):
+        return self.ticks_us() // 1000
+
+    def sleep_us(self, us):
+        if self.on_sleep:
+            self.on_sleep()
+        if us > 0:
+            self.slept_us += int(us)
+
+    def sleep_ms(self, ms):
+        self.sleep_us(ms * 1000)
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    @staticmethod
+    def ticks_diff(end, start):
+        return end - start
+
+
+class Board:
+    """A D1 Mini with a MAX7219 chain on SPI 1, CS on GPIO 15 (D8)."""
+
+    def __init__(self, num=4, cs_pin=15):
+        self.cs_pin = cs_pin
+        self.chain = MAX7219Chain(num)
+        self.trace = Trace(num)
+        self.clock = VirtualClock(self.commit)
+        self.selected = False
+        self.spi_writes = 0
+        self.spi_bytes = 0
+        self._latched = 0
+
+    def commit(self):
+        """Record a frame if the chain latched anything since the last one."""
+        if self.chain.latches != self._latched:
+            self._latched = self.chain.latches
+            self.trace.record(self.clock.ticks_us(), self.chain)
+
+    def reset_stats(self):
+        self.spi_writes = 0
+        self.spi_bytes = 0
+        self.chain.latches = self._latched = 0
+        self.chain.register_writes = 0
+        self.trace.clear()
+
+
+class SPI:
+    """machine.SPI stand-in, bytes go to the board's chain while CS is low."""
+
+    def __init__(self, id=1, *args, **kwargs):
+        self.board = board
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def write(self, data):
+        self.board.spi_writes += 1
+        self.board.spi_bytes += len(data)
+        if self.board.selected:
+            self.board.chain.shift(data)
+
+
+class Pin:
+    """machine.Pin stand-in, the board's CS pin selects and latches the chain."""
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.board = board
+        self._value = 0
+        if value is not None:
+            self(value)
+
+    def init(self, mode=-1, value=None, *args, **kwargs):
+        if value is not None:
+            self(value)
+
+    def __call__(self, value=None):
+        if value is None:
+            return self._value
+        value = 1 if value else 0
+        if self.id == self.board.cs_pin:
+            if value and not self._value:
+                self.board.chain.latch()
+            self.board.selected = not value
+        self._value = value
+
+    value = __call__
+
+    def on(self):
+        self(1)
+
+    def off(self):
+        self(0)
+
+
+class FakeSPI:
+    """SPI bus that only counts traffic."""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+    def reset(self):
+        self.writes = 0
+        self.bytes = 0
+
+
+class FakeCS:
+    """Chip select pin that counts latch pulses."""
+    OUT = 1
+
+    def __init__(self):
+        self.latches = 0
+
+    def init(self, mode, value):
+        pass
+
+    def __call__(self, value):
+        if value:
+            self.latches += 1
+
+
+board = Board()
+
+
+def install():
+    """Register the stand-ins as `micropython`, `framebuf` and `machine` if missing.
+
+    Also adds ticks_ms/ticks_us/ticks_add/ticks_diff/sleep_ms/sleep_us on
+    the board's virtual clock to `time`; time.sleep itself is untouched.
+    """
+    try:
+        import framebuf  # noqa: F401  (only present on MicroPython)
+        return
+    except ImportError:
+        pass
+
+    micropython = types.ModuleType('micropython')
+    micropython.const = lambda value: value
+    sys.modules['micropython'] = micropython
+
+    framebuf = types.ModuleType('framebuf')
+    framebuf.MONO_VLSB = MONO_VLSB
+    framebuf.MONO_HLSB = MONO_HLSB
+    framebuf.FrameBuffer = FrameBuffer
+    sys.modules['framebuf'] = framebuf
+
+    machine = types.ModuleType('machine')
+    machine.SPI = SPI
+    machine.Pin = Pin
+    machine.reset = lambda: None
+    machine.freq = lambda *args: 80000000
+    sys.modules['machine'] = machine
+
+    clock = board.clock
+    for name in ('ticks_ms', 'ticks_us', 'ticks_add', 'ticks_diff', 'sleep_ms', 'sleep_us'):
+        setattr(time, name, getattr(clock, name))
+
+
+def main():
+    if len(sys.argv) != 2:
+        raise SystemExit("usage: python display_sim.py TRACE")
+    frames = list(read_trace(sys.argv[1]))
+    previous = None
+    for index, (timestamp, intensity, flags, frame) in enumerate(frames):
+        state = "off" if flags & 1 else f"intensity {intensity}"
+        print(f"--- frame {index} at {timestamp / 1000:.1f} ms, {state}")
+        if frame != previous:
+            print(frame_ascii(frame, len(frame) // 8))
+        previous = frame
+    print(f"{len(frames)} frames")
+
+
+if __name__ == "__main__":
+    main()
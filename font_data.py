@@ -0,0 +1,27 @@
+"""
+Packed font data for custom_font.py.
+
+Generated by compile_font.py from font_source.py - do not edit by hand.
+Every glyph is 8 MONO_HLSB row bytes. Glyph i of a font starts at
+<FONT>_OFFSET + 8 * i, where i is its position in <FONT>_CHARS.
+"""
+
+LARGE_CHARS = '0123456789'
+LARGE_OFFSET = 0
+SMALL_CHARS = 'AB'
+SMALL_OFFSET = 80
+
+DATA = (
+    b'\x3c\x66\x66\x66\x66\x66\x66\x3c'  # LARGE '0'
+    b'\x18\x38\x18\x18\x18\x18\x18\x7e'  # LARGE '1'
+    b'\x3c\x66\x06\x0c\x18\x30\x60\x7e'  # LARGE '2'
+    b'\x3c\x66\x06\x1c\x06\x06\x66\x3c'  # LARGE '3'
+    b'\x0c\x1c\x3c\x6c\x7e\x0c\x0c\x0c'  # LARGE '4'
+    b'\x7e\x60\x60\x7c\x06\x06\x66\x3c'  # LARGE '5'
+    b'\x3c\x66\x60\x7c\x66\x66\x66\x3c'  # LARGE '6'
+    b'\x7e\x06\x0c\x18\x30\x30\x30\x30'  # LARGE '7'
+    b'\x3c\x66\x66\x3c\x66\x66\x66\x3c'  # LARGE '8'
+    b'\x3c\x66\x66\x66\x3e\x06\x66\x3c'  # LARGE '9'
+    b'\x20\x50\x88\xf8\x88\x88\x88\x00'  # SMALL 'A'
+    b'\xf0\x88\x88\xf0\x88\x88\xf0\x00'  # SMALL 'B'
+)
@@ -0,0 +1,136 @@
+"""
+Font source definitions for the MAX7219 LED matrix display.
+Each character is defined as an 8x8 bitmap where 1 represents an ON pixel and 0 represents an OFF pixel.
+
+This file is not uploaded to the D1 Mini. Edit the glyphs here and run
+compile_font.py to regenerate font_data.py, which custom_font.py reads.
+"""
+
+# Custom large number font (8x8 pixels per digit)
+LARGE_NUMBERS = {
+    '0': [
+        0b00111100,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b00111100
+    ],
+    '1': [
+        0b00011000,
+        0b00111000,
+        0b00011000,
+        0b00011000,
+        0b00011000,
+        0b00011000,
+        0b00011000,
+        0b01111110
+    ],
+    '2': [
+        0b00111100,
+        0b01100110,
+        0b00000110,
+        0b00001100,
+        0b00011000,
+        0b00110000,
+        0b01100000,
+        0b01111110
+    ],
+    '3': [
+        0b00111100,
+        0b01100110,
+        0b00000110,
+        0b00011100,
+        0b00000110,
+        0b00000110,
+        0b01100110,
+        0b00111100
+    ],
+    '4': [
+        0b00001100,
+        0b00011100,
+        0b00111100,
+        0b01101100,
+        0b01111110,
+        0b00001100,
+        0b00001100,
+        0b00001100
+    ],
+    '5': [
+        0b01111110,
+        0b01100000,
+        0b01100000,
+        0b01111100,
+        0b00000110,
+        0b00000110,
+        0b01100110,
+        0b00111100
+    ],
+    '6': [
+        0b00111100,
+        0b01100110,
+        0b01100000,
+        0b01111100,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b00111100
+    ],
+    '7': [
+        0b01111110,
+        0b00000110,
+        0b00001100,
+        0b00011000,
+        0b00110000,
+        0b00110000,
+        0b00110000,
+        0b00110000
+    ],
+    '8': [
+        0b00111100,
+        0b01100110,
+        0b01100110,
+        0b00111100,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b00111100
+    ],
+    '9': [
+        0b00111100,
+        0b01100110,
+        0b01100110,
+        0b01100110,
+        0b00111110,
+        0b00000110,
+        0b01100110,
+        0b00111100
+    ]
+}
+
+# Custom small font (5x8 pixels per character)
+SMALL_FONT = {
+    'A': [
+        0b00100000,
+        0b01010000,
+        0b10001000,
+        0b11111000,
+        0b10001000,
+        0b10001000,
+        0b10001000,
+        0b00000000
+    ],
+    'B': [
+        0b11110000,
+        0b10001000,
+        0b10001000,
+        0b11110000,
+        0b10001000,
+        0b10001000,
+        0b11110000,
+        0b00000000
+    ],
+    # Add more characters as needed
+}
@@ -0,0 +1,119 @@
+"""
+Streaming extraction of top-level JSON fields for the ESP8266.
+
+response.json() reads the whole body into one bytes object and then builds
+the complete dict, which for a /gear/{id} answer is several times the size
+of the two values the display needs. extract_fields() reads the socket in
+small chunks into a fixed buffer and only keeps the bytes of the requested
+top-level values.
+
+    >>> import json_stream
+    >>> fields = json_stream.extract_fields(response.raw, ('distance', 'name'))
+"""
+
+import json
+from micropython import const
+
+_QUOTE = const(34)       # "
+_BACKSLASH = const(92)   # \
+_COLON = const(58)       # :
+_COMMA = const(44)       # ,
+_OPEN_OBJECT = const(123)
+_CLOSE_OBJECT = const(125)
+_OPEN_ARRAY = const(91)
+_CLOSE_ARRAY = const(93)
+
+# Keys longer than this are never wanted, so longer strings are not buffered
+MAX_KEY_LENGTH = const(32)
+
+def extract_fields(stream, keys, chunk_size=128):
+    """Read a JSON object from a stream and return the requested top-level fields.
+
+    Reading stops as soon as all keys were found, the rest of the body is
+    left unread. Nested values are returned as parsed objects as well.
+
+    Args:
+        stream: Object with readinto(), e.g. urequests' response.raw
+        keys (tuple): Names of the top-level fields to extract
+        chunk_size (int): Bytes read from the stream per call
+
+    Returns:
+        dict: {key: value} for every requested key present in the document
+    """
+    wanted = {}
+    for key in keys:
+        wanted[key.encode()] = key
+    results = {}
+
+    chunk = bytearray(chunk_size)
+    view = memoryview(chunk)
+    text = bytearray()      # Current string at depth 1, a key candidate
+    last_string = None      # Last complete string at depth 1
+    capture = None          # Raw bytes of the value being extracted
+    capture_key = None
+    depth = 0
+    in_string = False
+    escaped = False
+
+    while True:
+        count = stream.readinto(chunk)
+        if not count:
+            return results
+        for c in view[:count]:
+            if capture is not None:
+                # Inside a wanted value: keep its bytes until it ends at depth 1
+                if in_string:
+                    capture.append(c)
+                    if escaped:
+                        escaped = False
+                    elif c == _BACKSLASH:
+                        escaped = True
+                    elif c == _QUOTE:
+                        in_string = False
+                    continue
+                if depth == 1 and (c == _COMMA or c == _CLOSE_OBJECT):
+                    results[capture_key] = json.loads(bytes(capture))
+                    capture = None
+                    if len(results) == len(wanted):
+                        return results
+                    if c == _CLOSE_OBJECT:
+                        depth -= 1
+                    continue
+                if c == _QUOTE:
+                    in_string = True
+                elif c == _OPEN_OBJECT or c == _OPEN_ARRAY:
+                    depth += 1
+                elif c == _CLOSE_OBJECT or c == _CLOSE_ARRAY:
+                    depth -= 1
+                capture.append(c)
+                continue
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif c == _BACKSLASH:
+                    escaped = True
+                elif c == _QUOTE:
+                    in_string = False
+                    if depth == 1 and text is not None:
+                        last_string = bytes(text)
+                    continue
+                if depth == 1 and text is not None:
+                    if len(text) < MAX_KEY_LENGTH:
+                        text.append(c)
+                    else:
+                        text = None
+                continue
+
+            if c == _QUOTE:
+                in_string = True
+                text = bytearray()
+                last_string = None
+            elif c == _OPEN_OBJECT or c == _OPEN_ARRAY:
+                depth += 1
+            elif c == _CLOSE_OBJECT or c == _CLOSE_ARRAY:
+                depth -= 1
+            elif c == _COLON and depth == 1 and last_string in wanted:
+                capture = bytearray()
+                capture_key = wanted[last_string]
+                last_string = None
@@ -6,6 +6,8 @@ import gc
 import machine
 from machine import Pin
 import credentials as creds
+import strava_token
+import json_stream
 
 # Initialize status LED (built-in LED on D1 Mini)
 led = Pin(2, Pin.OUT)
@@ -48,26 +50,13 @@ def connect_wifi():
     return True
 
 def get_strava_token():
-    """Get a fresh Strava access token."""
-    auth_url = "https://www.strava.com/oauth/token"
-    payload = {
-        'client_id': creds.STRAVA_CLIENT_ID,
-        'client_secret': creds.STRAVA_CLIENT_SECRET,
-        'refresh_token': creds.STRAVA_REFRESH_TOKEN,
-        'grant_type': 'refresh_token'
-    }
-    
-    try:
-        print("Requesting Strava token...")
-        response = requests.post(auth_url, json=payload)
-        token_data = response.json()
-        response.close()
-        gc.collect()  # Free up memory
+    """Get a Strava access token, reusing the cached one until it expires."""
+    print("Requesting Strava token...")
+    access_token = strava_token.get_access_token()
+    gc.collect()  # Free up memory
+    if access_token:
         print("Token received successfully")
-        return token_data.get('access_token')
-    except Exception as e:
-        print('Token Error:', e)
-        return None
+    return access_token
 
 def get_gear_distance():
     """Get the distance for the specified gear."""
@@ -83,12 +72,32 @@ def get_gear_distance():
         headers = {'Authorization': f'Bearer {access_token}'}
         
         response = requests.get(gear_url, headers=headers)
-        gear_data = response.json()
+        if response.status_code == 401:
+            # Cached token was revoked or the clock is off, refresh once
+            response.close()
+            strava_token.invalidate()
+            access_token = get_strava_token()
+            if not access_token:
+                return None
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = requests.get(gear_url, headers=headers)
+        if response.status_code != 200:
+            # A 429, 5xx or 404 body has no distance, do not report it as 0 km
+            print('Gear request failed with status', response.status_code)
+            response.close()
+            return None
+        # Stream the body instead of response.json(), only the distance is needed
+        gc.collect()
+        free_before = gc.mem_free()
+        gear_data = json_stream.extract_fields(response.raw, ('distance',))
         response.close()
+        print(f"Gear parse used {free_before - gc.mem_free()} bytes of heap")
         gc.collect()  # Free up memory
+        if 'distance' not in gear_data:
+            return None
         
         # Calculate distance in kilometers
-        distance_km = gear_data.get('distance', 0) / 1000
+        distance_km = gear_data['distance'] / 1000
         return distance_km
         
     except Exception as e:
@@ -53,6 +53,25 @@ class Matrix8x8:
         self.cs.init(cs.OUT, True)
         self.buffer = bytearray(8 * num)
         self.num = num
+        # Preallocated transmit buffers, one per digit row, so that a frame push
+        # is at most eight SPI writes and no heap allocation. show() rewrites
+        # both bytes of each module pair: the digit register and data where
+        # the byte changed, a NOOP pair where it did not.
+        self._rows = []
+        for y in range(8):
+            row = bytearray(2 * num)
+            for m in range(num):
+                row[2 * m] = _DIGIT0 + y
+            self._rows.append(row)
+        self._cmd = bytearray(2 * num)
+        # Shadow copy of what the modules currently hold, used by show() to
+        # skip digit rows that did not change since the last frame.
+        self._shadow = bytearray(8 * num)
+        self._synced = False
+        self.rows_sent = 0
+        self.rows_skipped = 0
+        self.intensity = 15  # Power-on default of the MAX7219
+        self.powered = False
         fb = framebuf.FrameBuffer(self.buffer, 8 * num, 8, framebuf.MONO_HLSB)
         self.framebuf = fb
         # Provide methods for accessing FrameBuffer graphics primitives. This is a workround
@@ -71,9 +90,12 @@ class Matrix8x8:
         self.init()
 
     def _write(self, command, data):
-        self.cs(0)
+        cmd = self._cmd
         for m in range(self.num):
-            self.spi.write(bytearray([command, data]))
+            cmd[2 * m] = command
+            cmd[2 * m + 1] = data
+        self.cs(0)
+        self.spi.write(cmd)
         self.cs(1)
 
     def init(self):
@@ -85,15 +107,73 @@ class Matrix8x8:
             (_SHUTDOWN, 1),
         ):
             self._write(command, data)
+        self.powered = True
+        self.invalidate()
+
+    def invalidate(self):
+        """Force the next show() to retransmit every row."""
+        self._synced = False
+
+    def reset_stats(self):
+        self.rows_sent = 0
+        self.rows_skipped = 0
 
     def brightness(self, value):
         if not 0 <= value <= 15:
             raise ValueError("Brightness out of range")
         self._write(_INTENSITY, value)
+        self.intensity = value
+
+    def power_off(self):
+        """Blank all modules with the MAX7219 shutdown mode.
+
+        The LEDs and scan oscillator stop, the digit registers keep the
+        current frame, so power_on() brings it back without redrawing.
+        """
+        self._write(_SHUTDOWN, 0)
+        self.powered = False
+
+    def power_on(self):
+        """Leave shutdown mode, three register writes, well below a frame.
+
+        Scan limit and intensity are sent again and the next show()
+        retransmits every row, in case a module lost its registers, e.g.
+        after a brown-out while the display was dark.
+        """
+        self._write(_SCANLIMIT, 7)
+        self._write(_INTENSITY, self.intensity)
+        self._write(_SHUTDOWN, 1)
+        self.powered = True
+        self.invalidate()
 
     def show(self):
+        # Only rows that differ from the shadow copy are sent. Within a sent
+        # row, modules whose byte did not change get a NOOP so they keep
+        # their register while the data is shifted through the chain.
+        buf = self.buffer
+        shadow = self._shadow
+        num = self.num
+        force = not self._synced
         for y in range(8):
-            self.cs(0)
-            for m in range(self.num):
-                self.spi.write(bytearray([_DIGIT0 + y, self.buffer[(y * self.num) + m]]))
-            self.cs(1)
+            row = self._rows[y]
+            offset = y * num
+            dirty = False
+            for m in range(num):
+                data = buf[offset + m]
+                if force or data != shadow[offset + m]:
+                    row[2 * m] = _DIGIT0 + y
+                    row[2 * m + 1] = data
+                    shadow[offset + m] = data
+                    dirty = True
+                else:
+                    row[2 * m] = _NOOP
+                    row[2 * m + 1] = 0
+            if dirty:
+                self.cs(0)
+                self.spi.write(row)
+                self.cs(1)
+                self.rows_sent += 1
+            else:
+                self.rows_skipped += 1
+        self._synced = True
+
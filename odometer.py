@@ -0,0 +1,72 @@
+"""
+Odometer-style digit roll for the large font.
+
+Each digit sits in its own 8x8 module and rolls upwards to the next digit
+like the wheel of a mechanical odometer: the lowest digit follows the
+fractional part of the value, a higher digit only turns while all digits
+below it roll over from 9. Odometer keeps the digit and roll offset last
+drawn per module and only rewrites the modules whose state changed, so
+Matrix8x8.show() only has those columns to send.
+
+    >>> odometer = Odometer(display)
+    >>> odometer.show(1234.5)   # '1234', last digit half way to 5
+"""
+
+from micropython import const
+from custom_font import get_char
+
+# Row bytes of the large digits 0-9
+_DIGITS = [get_char(str(digit), 'large') for digit in range(10)]
+
+_UNKNOWN = const(255)
+
+class Odometer:
+    def __init__(self, display, digits=4, module=0):
+        """
+        Args:
+            display: MAX7219 display instance
+            digits (int): Number of digits, one module each
+            module (int): Module of the leftmost (most significant) digit
+        """
+        self.display = display
+        self.module = module
+        self._state = bytearray(digits)  # digit * 8 + roll offset per digit, lowest first
+        self.redrawn = 0
+        self.reset()
+
+    def reset(self):
+        """Forget what is on the display, the next show() draws every digit."""
+        for k in range(len(self._state)):
+            self._state[k] = _UNKNOWN
+
+    def show(self, value):
+        """Draw a non-negative value, fractions roll the digits, and push it."""
+        buf = self.display.buffer
+        num = self.display.num
+        digits = len(self._state)
+        unit = 1
+        for k in range(digits):
+            whole = int(value // unit)
+            digit = whole % 10
+            if k == 0:
+                roll = value - whole
+            else:
+                # Turns only while the digits below go from 9.. to 0..
+                roll = value - whole * unit - (unit - 1)
+            offset = int(roll * 8) if roll > 0 else 0
+            state = digit * 8 + offset
+            if state != self._state[k]:
+                self._state[k] = state
+                self._draw(buf, num, self.module + digits - 1 - k, digit, offset)
+                self.redrawn += 1
+            unit *= 10
+        self.display.show()
+
+    @staticmethod
+    def _draw(buf, num, col, digit, offset):
+        """Write a digit rolled up by offset rows into module col."""
+        current = _DIGITS[digit]
+        following = _DIGITS[(digit + 1) % 10]
+        for row in range(8):
+            source = row + offset
+            buf[row * num + col] = current[source] if source < 8 else following[source - 8]
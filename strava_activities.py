@@ -1,48 +1,78 @@
 #!/usr/bin/python
 # -*- coding:utf-8 -*-
 
-import requests
+from strava_client import default_client
 import urllib3
-import credentials as auth
+import strava_token
+import strava_sync
+from strava_store import default_store
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+import numpy as np
+from activity_streams import ActivityStreams, convert_speed, moving_average, normalized_power, time_in_zones
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Zone settings for the stream summary, adjust to your own values
+FTP = 250  # Functional threshold power in watts
+MAX_HEARTRATE = 190  # bpm
+POWER_ZONES = (0.55, 0.75, 0.90, 1.05, 1.20, 1.50)  # Upper bounds as fraction of FTP
+HR_ZONES = (0.60, 0.70, 0.80, 0.90)  # Upper bounds as fraction of max heart rate
+
+# Companion athletes fetched in parallel, each costs up to three requests
+COMPANION_WORKERS = 4
+
+# Seconds a detailed activity response is reused within one run
+ACTIVITY_TTL = 300
+_activity_memo: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+_activity_lock = threading.Lock()
+
 def get_strava_token() -> Optional[str]:
-    """Get a fresh Strava access token using refresh token."""
-    auth_url = "https://www.strava.com/oauth/token"
-    payload = {
-        'client_id': auth.StravaCredentials['client_id'],
-        'client_secret': auth.StravaCredentials['client_secret'],
-        'refresh_token': auth.StravaCredentials['refresh_token'],
-        'grant_type': 'refresh_token'
-    }
+    """Get a Strava access token, reusing the cached one until it expires."""
+    print('Requesting Token...\n')
+    access_token = strava_token.get_access_token()
+    if not access_token:
+        print('Error getting access token')
+    return access_token
+
+def fetch_activity(activity_id: int, access_token: str) -> Dict[str, Any]:
+    """Get the raw detailed activity, downloading each ID at most once per run.
+
+    Responses are memoized for ACTIVITY_TTL seconds. Every caller in this
+    module goes through here, so e.g. the companion lookup reuses the
+    detail response already fetched for the main activity.
+    Raises requests.HTTPError if the request fails.
+    """
+    now = time.monotonic()
+    with _activity_lock:
+        cached = _activity_memo.get(activity_id)
+    if cached and now - cached[0] < ACTIVITY_TTL:
+        return cached[1]
     
-    try:
-        print('Requesting Token...\n')
-        res = requests.post(auth_url, data=payload, verify=False)
-        res.raise_for_status()
-        token_data = res.json()
-        return token_data['access_token']
-    except Exception as e:
-        print(f'Error getting access token: {e}')
-        return None
+    # include_all_efforts gives a superset of the plain response, so one
+    # cached answer serves every caller
+    detailed_url = f"https://www.strava.com/api/v3/activities/{activity_id}"
+    detailed_activity = default_client().get_json(detailed_url, params={'include_all_efforts': True},
+                                                  access_token=access_token)
+    with _activity_lock:
+        _activity_memo[activity_id] = (now, detailed_activity)
+    return detailed_activity
+
+def clear_activity_memo():
+    """Forget all memoized activity detail responses."""
+    with _activity_lock:
+        _activity_memo.clear()
 
 def get_activity_details(activity_id: int, access_token: str) -> Optional[Dict[str, Any]]:
     """Get detailed activity data including streams."""
-    headers = {'Authorization': f'Bearer {access_token}'}
+    client = default_client()
     
     try:
         # Get detailed activity data
-        detailed_url = f"https://www.strava.com/api/v3/activities/{activity_id}"
-        params = {
-            'include_all_efforts': True
-        }
-        
-        detailed_response = requests.get(detailed_url, headers=headers, params=params)
-        detailed_response.raise_for_status()
-        detailed_activity = detailed_response.json()
+        detailed_activity = fetch_activity(activity_id, access_token)
         
         print(f"\nDebug: Raw activity response for {activity_id}:")
         print(f"athlete_count: {detailed_activity.get('athlete_count')}")
@@ -50,16 +80,21 @@ def get_activity_details(activity_id: int, access_token: str) -> Optional[Dict[s
         print(f"athlete_pairs: {detailed_activity.get('athlete_pairs')}")
         print(f"other_athlete_count: {detailed_activity.get('other_athlete_count')}")
         
-        # Get activity streams
-        streams_url = f"https://www.strava.com/api/v3/activities/{activity_id}/streams"
-        streams_params = {
-            'keys': 'time,heartrate,watts,velocity_smooth,cadence,temp',
-            'key_by_type': True
-        }
-        
-        streams_response = requests.get(streams_url, headers=headers, params=streams_params)
-        streams_response.raise_for_status()
-        streams = streams_response.json()
+        # Get activity streams, they never change once uploaded so the
+        # local store is asked first
+        store = default_store()
+        streams = store.get_streams(activity_id)
+        if streams is None:
+            streams_url = f"https://www.strava.com/api/v3/activities/{activity_id}/streams"
+            streams_params = {
+                'keys': 'time,heartrate,watts,velocity_smooth,cadence,temp',
+                'key_by_type': True
+            }
+            
+            streams_response = client.get(streams_url, params=streams_params, access_token=access_token)
+            streams_response.raise_for_status()
+            streams = streams_response.json()
+            store.save_streams(activity_id, streams)
         
         # Format the activity data
         formatted_activity = {
@@ -97,7 +132,7 @@ def get_activity_details(activity_id: int, access_token: str) -> Optional[Dict[s
                 'lastname': detailed_activity.get('athlete', {}).get('lastname', ''),
                 'username': detailed_activity.get('athlete', {}).get('username', 'unknown')
             },
-            'streams': streams
+            'streams': ActivityStreams.from_strava(streams)
         }
         
         return formatted_activity
@@ -106,114 +141,133 @@ def get_activity_details(activity_id: int, access_token: str) -> Optional[Dict[s
         print(f'Error fetching activity details: {e}')
         return None
 
-def get_companion_activities(activity_id: int, access_token: str) -> List[Dict[str, Any]]:
-    """Get activities from companions that match the given activity."""
-    headers = {'Authorization': f'Bearer {access_token}'}
-    companion_activities = []
+def fetch_companion_activity(athlete: Dict[str, Any], activity_start: datetime,
+                             access_token: str) -> Optional[Dict[str, Any]]:
+    """Find and fetch one companion's activity matching the given start time.
+
+    Errors are reported and turned into None, so one failing athlete does
+    not stop the others.
+    """
+    athlete_id = athlete.get('id')
+    if not athlete_id:
+        return None
+    time_window = timedelta(minutes=5)  # Look for activities starting within 5 minutes
     
     try:
-        # First get the original activity to find companions
-        detailed_url = f"https://www.strava.com/api/v3/activities/{activity_id}"
-        response = requests.get(detailed_url, headers=headers)
-        response.raise_for_status()
-        activity = response.json()
+        print(f"Fetching activities for athlete {athlete_id}...")
+        # Search for activities from this athlete around the same time
+        athlete_activities_url = f"https://www.strava.com/api/v3/athletes/{athlete_id}/activities"
+        params = {
+            'after': int((activity_start - time_window).timestamp()),
+            'before': int((activity_start + time_window).timestamp()),
+            'per_page': 5
+        }
         
-        print(f"\nDebug: Activity response data:")
-        print(f"athlete_count: {activity.get('athlete_count')}")
-        print(f"total_athlete_count: {activity.get('total_athlete_count')}")
-        print(f"athlete_pairs: {activity.get('athlete_pairs')}")
-        print(f"other_athlete_count: {activity.get('other_athlete_count')}")
+        response = default_client().get(athlete_activities_url, params=params, access_token=access_token)
+        if response.status_code != 200:
+            print(f"Could not fetch activities for athlete {athlete_id} (Status: {response.status_code})")
+            if response.status_code == 404:
+                print("This might be due to privacy settings or the athlete not being a connection")
+            return None
         
-        # If there are companion athletes
-        athlete_count = activity.get('athlete_count', 0)
-        if athlete_count > 1:
-            print(f"\nFound {athlete_count - 1} companion(s). Fetching their activities...")
-            
-            # Get the start time window to search for companion activities
-            activity_start = datetime.fromisoformat(activity['start_date'])
-            time_window = timedelta(minutes=5)  # Look for activities starting within 5 minutes
-            
-            # Try different fields that might contain companion data
-            companion_athletes = (
-                activity.get('athlete_pairs', []) or 
-                activity.get('other_athletes', []) or 
-                activity.get('athletes', [])
-            )
-            
-            if not companion_athletes:
-                print("No companion athlete data found in the activity")
-                return []
-                
-            print(f"Found {len(companion_athletes)} companion athletes in the data")
-            
-            # For each companion athlete
-            for athlete in companion_athletes:
-                athlete_id = athlete.get('id')
-                if athlete_id:
-                    print(f"Fetching activities for athlete {athlete_id}...")
-                    # Search for activities from this athlete around the same time
-                    athlete_activities_url = f"https://www.strava.com/api/v3/athletes/{athlete_id}/activities"
-                    params = {
-                        'after': int((activity_start - time_window).timestamp()),
-                        'before': int((activity_start + time_window).timestamp()),
-                        'per_page': 5
-                    }
-                    
-                    response = requests.get(athlete_activities_url, headers=headers)
-                    if response.status_code == 200:
-                        athlete_activities = response.json()
-                        print(f"Found {len(athlete_activities)} activities for athlete {athlete_id}")
-                        
-                        # Find matching activity (similar start time)
-                        for athlete_activity in athlete_activities:
-                            athlete_start = datetime.fromisoformat(athlete_activity['start_date'])
-                            if abs((athlete_start - activity_start).total_seconds()) <= 300:  # Within 5 minutes
-                                # Get detailed activity data
-                                detailed_activity = get_activity_details(athlete_activity['id'], access_token)
-                                if detailed_activity:
-                                    companion_activities.append(detailed_activity)
-                                    print(f"Found matching activity for {athlete.get('firstname', 'Unknown')} {athlete.get('lastname', '')}")
-                                break
-                    else:
-                        print(f"Could not fetch activities for athlete {athlete_id} (Status: {response.status_code})")
-                        if response.status_code == 404:
-                            print("This might be due to privacy settings or the athlete not being a connection")
+        athlete_activities = response.json()
+        print(f"Found {len(athlete_activities)} activities for athlete {athlete_id}")
+        
+        # Find matching activity (similar start time)
+        for athlete_activity in athlete_activities:
+            athlete_start = datetime.fromisoformat(athlete_activity['start_date'])
+            if abs((athlete_start - activity_start).total_seconds()) <= time_window.total_seconds():
+                # Get detailed activity data
+                detailed_activity = get_activity_details(athlete_activity['id'], access_token)
+                if detailed_activity:
+                    print(f"Found matching activity for {athlete.get('firstname', 'Unknown')} {athlete.get('lastname', '')}")
+                return detailed_activity
+        return None
     
+    except Exception as e:
+        print(f'Error fetching activities for athlete {athlete_id}: {e}')
+        return None
+
+def iter_companion_activities(activity_id: int, access_token: str,
+                              max_workers: int = COMPANION_WORKERS) -> Iterator[Dict[str, Any]]:
+    """Yield companion activities matching the given activity as they arrive.
+
+    Companions are fetched on up to max_workers threads and every match is
+    yielded as soon as its athlete is done, so callers can start printing
+    before the slowest athlete has answered.
+    """
+    try:
+        # First get the original activity to find companions
+        activity = fetch_activity(activity_id, access_token)
     except Exception as e:
         print(f'Error fetching companion activities: {e}')
-        print(f'Response content: {response.text if 'response' in locals() else "No response"}')
+        return
     
-    return companion_activities
-
-def get_most_recent_activity(token: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
-    """Get the most recent activity over 20km and any companion activities."""
-    # Get recent activities
-    activities_url = "https://www.strava.com/api/v3/activities"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"per_page": 10}  # Fetch last 10 activities to find one over 20km
+    print(f"\nDebug: Activity response data:")
+    print(f"athlete_count: {activity.get('athlete_count')}")
+    print(f"total_athlete_count: {activity.get('total_athlete_count')}")
+    print(f"athlete_pairs: {activity.get('athlete_pairs')}")
+    print(f"other_athlete_count: {activity.get('other_athlete_count')}")
+    
+    # If there are companion athletes
+    athlete_count = activity.get('athlete_count', 0)
+    if athlete_count <= 1:
+        return
+    print(f"\nFound {athlete_count - 1} companion(s). Fetching their activities...")
+    
+    # Get the start time window to search for companion activities
+    activity_start = datetime.fromisoformat(activity['start_date'])
     
+    # Try different fields that might contain companion data
+    companion_athletes = (
+        activity.get('athlete_pairs', []) or 
+        activity.get('other_athletes', []) or 
+        activity.get('athletes', [])
+    )
+    
+    if not companion_athletes:
+        print("No companion athlete data found in the activity")
+        return
+        
+    print(f"Found {len(companion_athletes)} companion athletes in the data")
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(companion_athletes)))) as executor:
+        futures = [executor.submit(fetch_companion_activity, athlete, activity_start, access_token)
+                   for athlete in companion_athletes]
+        for future in as_completed(futures):
+            companion = future.result()
+            if companion:
+                yield companion
+
+def get_companion_activities(activity_id: int, access_token: str,
+                             max_workers: int = COMPANION_WORKERS) -> List[Dict[str, Any]]:
+    """Get activities from companions that match the given activity."""
+    return list(iter_companion_activities(activity_id, access_token, max_workers))
+
+def get_most_recent_activity(token: str, stream: bool = False
+                             ) -> Tuple[Optional[Dict[str, Any]], Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]]:
+    """Get the most recent activity over 20km and any companion activities.
+
+    With stream=True the companions are returned as an iterator that yields
+    each match as soon as it has been fetched, instead of a list.
+    """
+    # Bring the local activity store up to date, usually one small request.
+    # If that fails the activities synced by earlier runs are still used.
     try:
-        response = requests.get(activities_url, headers=headers, params=params)
-        response.raise_for_status()
-        activities = response.json()
-        print(f"\nFound {len(activities)} recent activities")
+        strava_sync.sync_activities()
     except Exception as e:
-        print(f"Error fetching activities: {e}")
-        return None, []
+        print(f"Error syncing activities: {e}")
     
     # Find most recent activity over 20km
-    activity = None
-    for act in activities:
-        if act['distance'] >= 20000:  # 20km in meters
-            activity = act
-            print(f"\nFound activity over 20km: {act['name']}")
-            print(f"Initial activity data:")
-            print(f"- ID: {act['id']}")
-            print(f"- Distance: {act['distance'] / 1000:.2f} km")
-            print(f"- Athlete count: {act.get('athlete_count', 0)}")
-            print(f"- Total athlete count: {act.get('total_athlete_count', 0)}")
-            print(f"- Other athlete count: {act.get('other_athlete_count', 0)}")
-            break
+    activity = default_store().most_recent_activity(min_distance=20000)  # 20km in meters
+    if activity:
+        print(f"\nFound activity over 20km: {activity['name']}")
+        print(f"Initial activity data:")
+        print(f"- ID: {activity['id']}")
+        print(f"- Distance: {activity['distance'] / 1000:.2f} km")
+        print(f"- Athlete count: {activity.get('athlete_count', 0)}")
+        print(f"- Total athlete count: {activity.get('total_athlete_count', 0)}")
+        print(f"- Other athlete count: {activity.get('other_athlete_count', 0)}")
     
     if not activity:
         print("No activities found over 20km")
@@ -239,6 +293,8 @@ def get_most_recent_activity(token: str) -> Tuple[Optional[Dict[str, Any]], List
         print(f"- Other athletes: {formatted_activity.get('other_athletes', [])}")
         
         # Get companion activities using the dedicated function
+        if stream:
+            return formatted_activity, iter_companion_activities(activity_id, token)
         companion_activities = get_companion_activities(activity_id, token)
         print(f"\nFound {len(companion_activities)} companion activities")
         
@@ -255,6 +311,30 @@ def format_time(seconds: int) -> str:
     seconds = seconds % 60
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+def format_sample(values: Optional[np.ndarray], index: int, width: int) -> str:
+    """Format one stream sample for the time series table, '-' if missing."""
+    if values is None or np.isnan(values[index]) or not values[index]:
+        return f"{'-':{width}}"
+    return f"{values[index]:{width}g}"
+
+def print_stream_summary(streams: ActivityStreams):
+    """Print vectorized summaries of the activity streams."""
+    print("\n=== Stream Summary ===")
+    np_watts = normalized_power(streams)
+    if np_watts is not None:
+        print(f"Normalized Power: {np_watts:.0f} W")
+        power = streams.resample('watts')
+        if len(power) >= 300:
+            best = np.nanmax(moving_average(power, 300)[299:])
+            print(f"Best 5 min Power: {best:.0f} W")
+    for label, key, bounds in (("Heart Rate", 'heartrate', [MAX_HEARTRATE * f for f in HR_ZONES]),
+                               ("Power", 'watts', [FTP * f for f in POWER_ZONES])):
+        seconds = time_in_zones(streams, key, bounds)
+        if seconds is None:
+            continue
+        zones = ", ".join(f"Z{zone + 1} {format_time(int(value))}" for zone, value in enumerate(seconds))
+        print(f"Time in {label} Zones: {zones}")
+
 def print_activity(activity: Dict[str, Any]):
     """Print formatted activity information."""
     print("\n=== Activity Information ===")
@@ -299,43 +379,48 @@ def print_activity(activity: Dict[str, Any]):
     print(f"Kudos: {activity.get('kudos_count', 0)}")
     
     # Print time series data if available
-    streams = activity.get('streams', {})
-    if streams:
+    streams = activity.get('streams')
+    if streams is not None and len(streams):
         print("\n=== Time Series Data ===")
         print("Time(s) | HR(bpm) | Power(W) | Speed(km/h) | Cadence(rpm) | Temp(°C)")
         print("-" * 65)
         
-        time_data = streams.get('time', {}).get('data', [])
-        hr_data = streams.get('heartrate', {}).get('data', [None] * len(time_data))
-        power_data = streams.get('watts', {}).get('data', [None] * len(time_data))
-        speed_data = streams.get('velocity_smooth', {}).get('data', [None] * len(time_data))
-        cadence_data = streams.get('cadence', {}).get('data', [None] * len(time_data))
-        temp_data = streams.get('temp', {}).get('data', [None] * len(time_data))
+        columns = [streams.get(key) for key in ('heartrate', 'watts', 'velocity_smooth', 'cadence', 'temp')]
+        if columns[2] is not None:
+            columns[2] = np.round(convert_speed(columns[2], 'km/h'), 1)
+        widths = (7, 7, 10, 11, 7)
+        
+        def row(i):
+            cells = [format_sample(values, i, width) for values, width in zip(columns, widths)]
+            return f"{streams.time[i]:6d} | " + " | ".join(cells)
         
         # Print first 5 and last 5 data points
-        for i in range(min(5, len(time_data))):
-            speed = round(speed_data[i] * 3.6, 1) if speed_data[i] is not None else None
-            print(f"{time_data[i]:6d} | {hr_data[i] or '-':7} | {power_data[i] or '-':7} | {speed or '-':10} | {cadence_data[i] or '-':11} | {temp_data[i] or '-':7}")
+        count = len(streams)
+        for i in range(min(5, count)):
+            print(row(i))
             
-        if len(time_data) > 10:
+        if count > 10:
             print("..." + " " * 62)
             
-        for i in range(max(5, len(time_data)-5), len(time_data)):
-            speed = round(speed_data[i] * 3.6, 1) if speed_data[i] is not None else None
-            print(f"{time_data[i]:6d} | {hr_data[i] or '-':7} | {power_data[i] or '-':7} | {speed or '-':10} | {cadence_data[i] or '-':11} | {temp_data[i] or '-':7}")
+        for i in range(max(5, count - 5), count):
+            print(row(i))
+        
+        print_stream_summary(streams)
             
     print("============================")
 
-def print_activity_comparison(main_activity: Dict[str, Any], companion_activities: List[Dict[str, Any]]):
-    """Print activity data with companion comparisons."""
+def print_activity_comparison(main_activity: Dict[str, Any], companion_activities: Iterable[Dict[str, Any]]):
+    """Print activity data with companion comparisons.
+
+    companion_activities may be an iterator, each comparison is printed as
+    soon as its companion arrives.
+    """
     print("\n=== Your Activity ===")
     print_activity(main_activity)
     
-    if not companion_activities:
-        print("\nNo companion activities found for this ride.")
-        return
-        
+    found = False
     for companion in companion_activities:
+        found = True
         print(f"\n=== {companion.get('athlete', {}).get('firstname', 'Unknown')} {companion.get('athlete', {}).get('lastname', '')}\'s Activity ===")
         print_activity(companion)
         
@@ -352,6 +437,9 @@ def print_activity_comparison(main_activity: Dict[str, Any], companion_activitie
             print(f"Average Heart Rate: You: {main_activity['average_heartrate']:.1f} bpm vs {companion.get('athlete', {}).get('firstname', 'Unknown')}: {companion['average_heartrate']:.1f} bpm")
             
         print("============================")
+    
+    if not found:
+        print("\nNo companion activities found for this ride.")
 
 def main():
     """Main function to fetch and display activity data."""
@@ -360,12 +448,15 @@ def main():
         print("Failed to get token")
         return
         
-    activity, companion_activities = get_most_recent_activity(token)
+    activity, companion_activities = get_most_recent_activity(token, stream=True)
     if not activity:
         print("No activities found")
         return
         
     print_activity_comparison(activity, companion_activities)
+    print(f"\nStrava API usage: {default_client().rate_limiter.describe()}")
+    if default_client().cache:
+        print(f"Response cache: {default_client().cache.describe()}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
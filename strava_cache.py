@@ -0,0 +1,200 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+On-disk HTTP response cache for StravaClient GET requests.
+
+Responses are keyed on URL and query parameters and kept in a SQLite file.
+Within an endpoint's TTL a cached response is returned without touching
+the network. After that the request is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged resource costs a 304 without a body.
+Least recently used entries are evicted once the cache exceeds its size cap.
+
+Entries are not keyed on the access token, the cache is meant for the
+single athlete whose credentials.py the host scripts use.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_FILE = 'strava_cache.db'
+MAX_BYTES = 50 * 1024 * 1024
+
+# Seconds a response is served without revalidation, first match wins.
+# Streams and activity details rarely change once a ride is uploaded. Gear
+# and athlete carry the gear distances, which grow with every upload, so
+# they are revalidated every time like the activity list; a 304 is cheap.
+ENDPOINT_TTLS: Sequence[Tuple[str, int]] = (
+    (r'/activities/\d+/streams$', 30 * 24 * 3600),
+    (r'/activities/\d+$', 24 * 3600),
+    (r'/gear/[^/]+$', 0),
+    (r'/athlete$', 0),
+    (r'/athlete/activities$', 0),
+)
+DEFAULT_TTL = 0
+
+# Response headers worth keeping with a cached body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Stable key for a URL and its query parameters."""
+    return url + '?' + json.dumps(sorted((params or {}).items()), default=str)
+
+
+def endpoint_ttl(url: str) -> int:
+    path = url.split('?', 1)[0]
+    for pattern, ttl in ENDPOINT_TTLS:
+        if re.search(pattern, path):
+            return ttl
+    return DEFAULT_TTL
+
+
+class CacheEntry:
+    """A cached 200 response."""
+
+    def __init__(self, key: str, url: str, headers: Dict[str, str], body: bytes, stored_at: float):
+        self.key = key
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.stored_at < endpoint_ttl(self.url)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def response(self) -> requests.Response:
+        """Rebuild a requests.Response from the cached data."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = 'utf-8'
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """SQLite-backed LRU cache of GET responses with a size cap."""
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.executescript(SCHEMA)
+
+    def lookup(self, url: str, params: Optional[Dict[str, Any]]) -> Optional[CacheEntry]:
+        key = cache_key(url, params)
+        with self.lock:
+            row = self.db.execute("SELECT url, headers, body, stored_at FROM responses WHERE key = ?",
+                                  (key,)).fetchone()
+            if row is None:
+                return None
+            with self.db:
+                self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(key, row[0], json.loads(row[1]), row[2], row[3])
+
+    def get(self, url: str, params: Optional[Dict[str, Any]]) -> Tuple[Optional[CacheEntry], Optional[requests.Response]]:
+        """Return (entry, fresh response). The response is None if the entry is stale or missing."""
+        entry = self.lookup(url, params)
+        if entry and entry.is_fresh(time.time()):
+            self.hits += 1
+            return entry, entry.response()
+        return entry, None
+
+    def store(self, url: str, params: Optional[Dict[str, Any]], response: requests.Response,
+              entry: Optional[CacheEntry]) -> requests.Response:
+        """Record a network response and return what the caller should see.
+
+        A 304 refreshes the matching entry and returns its cached body, a
+        200 replaces the entry, anything else is passed through untouched.
+        """
+        now = time.time()
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            with self.lock, self.db:
+                self.db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                                (now, now, entry.key))
+            entry.stored_at = now
+            return entry.response()
+        if response.status_code != 200:
+            return response
+
+        self.misses += 1
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        body = response.content
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, url, headers, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url, params), url, json.dumps(headers), body, len(body), now, now))
+            self._evict()
+        return response
+
+    def _evict(self):
+        """Drop least recently used entries above max_bytes. Caller holds the lock."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def size(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM responses")
+
+    def describe(self) -> str:
+        return f"{self.hits} fresh hits, {self.revalidated} revalidated, {self.misses} downloaded"
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def default_cache() -> ResponseCache:
+    """Return the process-wide cache shared by all Strava clients."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Pooled HTTP client for the host-side Strava scripts.
+
+All requests go through one requests.Session, so the TCP+TLS connection
+to www.strava.com is opened once and kept alive instead of being set up
+again for every call. Transient server errors are retried with backoff,
+and every request is scheduled against Strava's rate limits. Responses
+are cached on disk and revalidated with conditional requests.
+
+    >>> from strava_client import default_client
+    >>> response = default_client().get("/athlete")
+"""
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import strava_token
+from strava_ratelimit import RateLimiter, default_limiter
+from strava_cache import ResponseCache, default_cache
+
+BASE_URL = "https://www.strava.com/api/v3"
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class StravaClient:
+    """Strava API client on top of a pooled, keep-alive requests.Session."""
+
+    def __init__(self,
+                 base_url: str = BASE_URL,
+                 pool_size: int = 10,
+                 timeout: Timeout = (5, 30),
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 verify: Union[bool, str] = True,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Union[ResponseCache, bool] = True):
+        """
+        Args:
+            base_url: Prefix for relative paths passed to get()
+            pool_size: Connections kept open per host
+            timeout: (connect, read) timeout in seconds
+            retries: Retries for connection errors and 5xx responses
+            backoff: Backoff factor between retries, in seconds
+            verify: TLS verification, as for requests
+            rate_limiter: Request scheduler, the shared one if omitted
+            cache: Response cache, True for the shared one, False for none
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        # Passed per request: Session.verify loses against REQUESTS_CA_BUNDLE
+        self.verify = verify
+        self.session = requests.Session()
+        self.rate_limiter = rate_limiter or default_limiter()
+        self.cache = default_cache() if cache is True else cache or None
+
+        retry = Retry(total=retries,
+                      backoff_factor=backoff,
+                      status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, path: str) -> str:
+        """Turn an API path into a full URL, full URLs are left alone."""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+            access_token: Optional[str] = None) -> requests.Response:
+        """GET an API path or URL with a bearer token.
+
+        A response still within its endpoint's cache TTL is returned without
+        a request. Without an explicit access_token the shared cached token
+        is used, and a 401 answer triggers one retry with a refreshed token.
+        """
+        url = self.url(path)
+        entry = None
+        if self.cache:
+            entry, cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        conditional = entry.validators() if entry else {}
+
+        explicit = access_token is not None
+        token = access_token if explicit else strava_token.get_access_token()
+        response = self._send(url, params, token, conditional)
+        if response.status_code == 401 and not explicit:
+            strava_token.invalidate()
+            response = self._send(url, params, strava_token.get_access_token(), conditional)
+        if self.cache:
+            response = self.cache.store(url, params, response, entry)
+        return response
+
+    def _send(self, url: str, params: Optional[Dict[str, Any]], token: Optional[str],
+              headers: Dict[str, str]) -> requests.Response:
+        """Send one GET within the rate limits, waiting out a 429 once."""
+        headers = dict(headers, Authorization=f'Bearer {token}')
+        for attempt in range(2):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, timeout=self.timeout, verify=self.verify,
+                                        headers=headers)
+            self.rate_limiter.update(response.headers)
+            if response.status_code != 429:
+                break
+            self.rate_limiter.exhausted()
+        return response
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                 access_token: Optional[str] = None) -> Any:
+        """GET and decode JSON, raising requests.HTTPError on error status."""
+        response = self.get(path, params=params, access_token=access_token)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_client: Optional[StravaClient] = None
+
+
+def default_client() -> StravaClient:
+    """Return the process-wide client shared by all host scripts."""
+    global _default_client
+    if _default_client is None:
+        _default_client = StravaClient()
+    return _default_client
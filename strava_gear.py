@@ -1,103 +1,125 @@
 #!/usr/bin/python
 # -*- coding:utf-8 -*-
 
-import requests
+from strava_client import default_client
 import urllib3
-import credentials as auth
+import strava_token
+import strava_sync
+from strava_store import default_store
+import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Concurrent /gear/{id} requests, kept below the client's connection pool size
+MAX_WORKERS = 4
+
 def get_strava_token():
-    """Get a fresh Strava access token using refresh token."""
-    auth_url = "https://www.strava.com/oauth/token"
-    payload = {
-        'client_id': auth.STRAVA_CLIENT_ID,
-        'client_secret': auth.STRAVA_CLIENT_SECRET,
-        'refresh_token': auth.STRAVA_REFRESH_TOKEN,
-        'grant_type': 'refresh_token'
-    }
-    
-    try:
-        res = requests.post(auth_url, data=payload, verify=False)
-        return res.json()['access_token']
-    except Exception as e:
-        print(f'Error getting access token: {e}')
-        return None
+    """Get a Strava access token, reusing the cached one until it expires."""
+    access_token = strava_token.get_access_token()
+    if not access_token:
+        print('Error getting access token')
+    return access_token
 
-def get_athlete_gear():
-    """Get all gear associated with the authenticated athlete."""
+def get_athlete_gear(max_workers=MAX_WORKERS, details=True):
+    """Get all gear associated with the authenticated athlete.
+
+    The detailed athlete response already lists bikes and shoes, so the
+    activity scan is only used when the profile has no gear. Gear details
+    are fetched concurrently with up to max_workers threads sharing one
+    access token; 1 fetches them one after another.
+
+    Args:
+        max_workers (int): Concurrent /gear/{id} requests
+        details (bool): Fetch /gear/{id} for brand and model; False returns
+            the summary gear (id, name, distance, primary) from /athlete
+    """
     access_token = get_strava_token()
     if not access_token:
         return None
         
     # Use the detailed athlete endpoint
     athlete_url = "https://www.strava.com/api/v3/athlete"
-    activities_url = "https://www.strava.com/api/v3/athlete/activities"
-    headers = {'Authorization': f'Bearer {access_token}'}
+    client = default_client()
     
     try:
         print("Fetching athlete data...")
-        response = requests.get(athlete_url, headers=headers)
+        response = client.get(athlete_url, access_token=access_token)
         if response.status_code != 200:
             print(f"Error: API returned status code {response.status_code}")
             print(f"Response: {response.text}")
             return None
             
         athlete_data = response.json()
+        summaries = (athlete_data.get('bikes') or []) + (athlete_data.get('shoes') or [])
         
-        # Fetch recent activities to get gear IDs
-        print("Fetching recent activities...")
-        response = requests.get(activities_url, headers=headers, params={'per_page': 200})
-        if response.status_code != 200:
-            print(f"Error: API returned status code {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
-            
-        activities = response.json()
-        
-        # Extract unique gear IDs from activities
-        gear_ids = set()
-        for activity in activities:
-            if 'gear_id' in activity and activity['gear_id']:
-                gear_ids.add(activity['gear_id'])
+        if summaries:
+            if not details:
+                default_store().save_gear(summaries)
+                return summaries
+            gear_ids = [gear['id'] for gear in summaries]
+        else:
+            print("No gear in athlete profile, scanning recent activities...")
+            gear_ids = get_gear_ids_from_activities()
                 
         if not gear_ids:
-            print("No gear IDs found in recent activities")
+            print("No gear IDs found")
             return None
             
         print(f"Found gear IDs: {gear_ids}")
             
         # Get detailed information for each piece of gear
-        gear_list = []
-        for gear_id in gear_ids:
-            gear_data = get_gear_info(gear_id)
-            if gear_data:
-                gear_list.append(gear_data)
-                
+        gear_list = get_gear_details(gear_ids, access_token, max_workers)
+        default_store().save_gear(gear_list)
         return gear_list
     except Exception as e:
         print(f'Error getting athlete gear: {e}')
         print(f'Full error: {traceback.format_exc()}')
         return None
 
-def get_gear_info(gear_id):
+def get_gear_ids_from_activities():
+    """Collect the gear IDs used in the synced activity history, sorted.
+
+    Only activities newer than the last sync are downloaded. The sync's
+    client gets its own access token.
+    """
+    print("Syncing activities...")
+    strava_sync.sync_activities()
+    return default_store().gear_ids()
+
+def get_gear_info(gear_id, access_token=None):
     """Get information about specific Strava gear."""
-    access_token = get_strava_token()
+    if access_token is None:
+        access_token = get_strava_token()
     if not access_token:
         return None
         
     gear_url = f"https://www.strava.com/api/v3/gear/{gear_id}"
-    headers = {'Authorization': f'Bearer {access_token}'}
+    client = default_client()
     
     try:
-        response = requests.get(gear_url, headers=headers)
+        response = client.get(gear_url, access_token=access_token)
         gear_data = response.json()
         return gear_data
     except Exception as e:
         print(f'Error getting gear info: {e}')
         return None
 
+def get_gear_details(gear_ids, access_token, max_workers=MAX_WORKERS):
+    """Get information about several pieces of gear concurrently.
+
+    Results keep the order of gear_ids, gear that could not be fetched is
+    left out. Wall time is roughly that of the slowest single request.
+    """
+    gear_ids = list(gear_ids)
+    if max_workers <= 1 or len(gear_ids) <= 1:
+        results = [get_gear_info(gear_id, access_token) for gear_id in gear_ids]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(gear_ids))) as executor:
+            results = list(executor.map(lambda gear_id: get_gear_info(gear_id, access_token), gear_ids))
+    return [gear_data for gear_data in results if gear_data]
+
 def display_gear_info(gear_data):
     """Display gear information in a formatted way."""
     if not gear_data:
@@ -117,8 +139,12 @@ def display_gear_info(gear_data):
     print("============================\n")
 
 def main():
-    # Get all athlete gear
-    gear_list = get_athlete_gear()
+    # Get all athlete gear, --summary skips the per-gear detail requests
+    # and --offline lists the gear stored by an earlier run without API calls
+    if '--offline' in sys.argv:
+        gear_list = default_store().all_gear()
+    else:
+        gear_list = get_athlete_gear(details='--summary' not in sys.argv)
     
     if gear_list:
         print("Found", len(gear_list), "pieces of gear:")
@@ -126,6 +152,9 @@ def main():
             display_gear_info(gear)
     else:
         print("No gear found or error occurred.")
+    print(f"Strava API usage: {default_client().rate_limiter.describe()}")
+    if default_client().cache:
+        print(f"Response cache: {default_client().cache.describe()}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Strava rate-limit tracking and request scheduling for the host scripts.
+
+Strava allows a fixed number of requests per 15-minute window (reset at
+:00, :15, :30 and :45 UTC) and per UTC day, and reports limit and usage
+in the X-RateLimit-* response headers. RateLimiter mirrors both windows
+from those headers and makes callers wait for the next window instead of
+running into 429 errors halfway through a long sync or companion crawl.
+
+    >>> limiter = RateLimiter()
+    >>> limiter.acquire()             # before each request
+    >>> limiter.update(response.headers)
+    >>> limiter.usage()
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+SHORT_WINDOW = 15 * 60
+DAY = 24 * 60 * 60
+
+# Strava's documented defaults, used until the first response arrives
+DEFAULT_LIMITS = (100, 1000)
+
+# Requests kept in hand for concurrent calls whose usage is not reported yet
+DEFAULT_RESERVE = 5
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the next free window is further away than max_wait."""
+
+
+class RateLimiter:
+    """Thread-safe tracker of Strava's 15-minute and daily request windows."""
+
+    def __init__(self, reserve: int = DEFAULT_RESERVE, max_wait: float = SHORT_WINDOW + 5,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep,
+                 limits: Tuple[int, int] = DEFAULT_LIMITS):
+        """
+        Args:
+            reserve: Requests left unused in each window as a safety margin
+            max_wait: Longest wait in seconds before RateLimitExceeded is
+                raised instead; the default covers one 15-minute window
+            clock: Source of Unix time, replaceable for testing
+            sleep: Sleep function, replaceable for testing
+            limits: 15-minute and daily limit assumed until a response
+                reports the real ones, e.g. higher for a local test server
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.limit_short, self.limit_daily = limits
+        self.usage_short = 0
+        self.usage_daily = 0
+        self.waited = 0.0
+        self._short_reset = self._next_boundary(SHORT_WINDOW)
+        self._daily_reset = self._next_boundary(DAY)
+
+    def _next_boundary(self, window: int) -> float:
+        now = self.clock()
+        return now - now % window + window
+
+    def _roll_windows(self):
+        """Start fresh counts once a window has passed. Caller holds the lock."""
+        now = self.clock()
+        if now >= self._short_reset:
+            self.usage_short = 0
+            self._short_reset = self._next_boundary(SHORT_WINDOW)
+        if now >= self._daily_reset:
+            self.usage_daily = 0
+            self._daily_reset = self._next_boundary(DAY)
+
+    def _wait_time(self) -> float:
+        """Seconds until a request fits into both windows. Caller holds the lock."""
+        now = self.clock()
+        if self.usage_daily >= self.limit_daily - self.reserve:
+            return self._daily_reset - now
+        if self.usage_short >= self.limit_short - self.reserve:
+            return self._short_reset - now
+        return 0.0
+
+    def acquire(self):
+        """Block until a request may be sent, then count it.
+
+        Raises:
+            RateLimitExceeded: If that would take longer than max_wait
+        """
+        while True:
+            with self.lock:
+                self._roll_windows()
+                wait = self._wait_time()
+                if wait <= 0:
+                    self.usage_short += 1
+                    self.usage_daily += 1
+                    return
+                if wait > self.max_wait:
+                    raise RateLimitExceeded(
+                        f"Strava rate limit reached ({self.describe()}), next window in {wait / 60:.0f} min")
+            print(f"Rate limit reached ({self.describe()}), waiting {wait:.0f} s...")
+            self.sleep(wait + 1)
+            self.waited += wait + 1
+
+    def update(self, headers: Mapping[str, str]):
+        """Take limit and usage from a response's rate-limit headers.
+
+        The read limits (X-ReadRateLimit-*) are used when present, since
+        the host scripts only send GET requests.
+        """
+        limit = headers.get('X-ReadRateLimit-Limit') or headers.get('X-RateLimit-Limit')
+        usage = headers.get('X-ReadRateLimit-Usage') or headers.get('X-RateLimit-Usage')
+        if not limit or not usage:
+            return
+        try:
+            limit_short, limit_daily = (int(value) for value in limit.split(','))
+            usage_short, usage_daily = (int(value) for value in usage.split(','))
+        except ValueError:
+            return
+        with self.lock:
+            self._roll_windows()
+            self.limit_short, self.limit_daily = limit_short, limit_daily
+            self.usage_short, self.usage_daily = usage_short, usage_daily
+
+    def exhausted(self):
+        """Mark the short window as used up, e.g. after a 429 answer."""
+        with self.lock:
+            self.usage_short = max(self.usage_short, self.limit_short)
+
+    def usage(self) -> Dict[str, Any]:
+        """Current usage, limits and seconds until each window resets."""
+        with self.lock:
+            self._roll_windows()
+            now = self.clock()
+            return {
+                'short': (self.usage_short, self.limit_short),
+                'daily': (self.usage_daily, self.limit_daily),
+                'short_reset_in': self._short_reset - now,
+                'daily_reset_in': self._daily_reset - now,
+                'waited': self.waited,
+            }
+
+    def describe(self) -> str:
+        return (f"15 min: {self.usage_short}/{self.limit_short}, "
+                f"daily: {self.usage_daily}/{self.limit_daily}")
+
+
+_default_limiter: Optional[RateLimiter] = None
+
+
+def default_limiter() -> RateLimiter:
+    """Return the process-wide limiter shared by all Strava clients."""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = RateLimiter()
+    return _default_limiter
@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Local SQLite store for Strava activities, gear and streams.
+
+Keeps what the host scripts downloaded so questions like "most recent
+ride over 20 km" or "km per gear" are answered from indexed tables
+instead of new API calls. The raw JSON of every record is kept next to
+the indexed columns, so callers get back the same dicts Strava returned.
+
+    >>> from strava_store import default_store
+    >>> default_store().most_recent_activity(min_distance=20000)
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+STORE_FILE = 'strava.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    start_date TEXT NOT NULL,
+    type TEXT,
+    distance REAL,
+    gear_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activities_start_date ON activities (start_date);
+CREATE INDEX IF NOT EXISTS activities_gear_id ON activities (gear_id);
+CREATE INDEX IF NOT EXISTS activities_distance ON activities (distance);
+
+CREATE TABLE IF NOT EXISTS gear (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    distance REAL,
+    retired INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS gear_distance ON gear (distance);
+
+CREATE TABLE IF NOT EXISTS streams (
+    activity_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ActivityStore:
+    """SQLite-backed store of activities, gear and activity streams."""
+
+    def __init__(self, path: str = STORE_FILE):
+        self.path = path
+        # Shared by the worker threads of the host scripts, one at a time
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def _fetch(self, query: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self.lock:
+            return self.db.execute(query, params).fetchall()
+
+    def _write(self, query: str, rows: List[Sequence[Any]]):
+        with self.lock, self.db:
+            self.db.executemany(query, rows)
+
+    # --- Activities ---
+
+    def save_activities(self, activities: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update summary or detailed activities, return the count."""
+        rows = [(activity['id'], activity['start_date'], activity.get('type'),
+                 activity.get('distance'), activity.get('gear_id'), json.dumps(activity))
+                for activity in activities]
+        self._write("INSERT OR REPLACE INTO activities (id, start_date, type, distance, gear_id, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get_activity(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM activities WHERE id = ?", (activity_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def recent_activities(self, limit: int = 10, min_distance: float = 0,
+                          activity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent activities first, optionally filtered by distance (m) and type."""
+        query = "SELECT data FROM activities WHERE distance >= ?"
+        params: List[Any] = [min_distance]
+        if activity_type:
+            query += " AND type = ?"
+            params.append(activity_type)
+        query += " ORDER BY start_date DESC LIMIT ?"
+        params.append(limit)
+        return [json.loads(row[0]) for row in self._fetch(query, params)]
+
+    def most_recent_activity(self, min_distance: float = 0,
+                             activity_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The latest activity of at least min_distance meters, or None."""
+        activities = self.recent_activities(1, min_distance, activity_type)
+        return activities[0] if activities else None
+
+    def activity_count(self) -> int:
+        return self._fetch("SELECT COUNT(*) FROM activities")[0][0]
+
+    # --- Gear ---
+
+    def save_gear(self, gear_list: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update summary or detailed gear, return the count."""
+        rows = [(gear['id'], gear.get('name'), gear.get('distance'),
+                 int(bool(gear.get('retired'))), json.dumps(gear))
+                for gear in gear_list]
+        self._write("INSERT OR REPLACE INTO gear (id, name, distance, retired, data) VALUES (?, ?, ?, ?, ?)",
+                    rows)
+        return len(rows)
+
+    def get_gear(self, gear_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM gear WHERE id = ?", (gear_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def all_gear(self) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._fetch("SELECT data FROM gear ORDER BY id")]
+
+    def gear_ids(self) -> List[str]:
+        """Every gear ID used by a stored activity, sorted."""
+        rows = self._fetch(
+            "SELECT DISTINCT gear_id FROM activities WHERE gear_id IS NOT NULL ORDER BY gear_id")
+        return [row[0] for row in rows]
+
+    def km_per_gear(self) -> Dict[str, float]:
+        """Distance in km per gear ID, summed over the stored activities."""
+        rows = self._fetch(
+            "SELECT gear_id, SUM(distance) FROM activities WHERE gear_id IS NOT NULL GROUP BY gear_id")
+        return {gear_id: total / 1000 for gear_id, total in rows}
+
+    # --- Streams ---
+
+    def save_streams(self, activity_id: int, streams: Dict[str, Any]):
+        self._write("INSERT OR REPLACE INTO streams (activity_id, data) VALUES (?, ?)",
+                    [(activity_id, json.dumps(streams))])
+
+    def get_streams(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM streams WHERE activity_id = ?", (activity_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    # --- Sync state ---
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        rows = self._fetch("SELECT value FROM sync_state WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def set_state(self, key: str, value: Any):
+        self._write("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value))])
+
+
+_default_store: Optional[ActivityStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_store() -> ActivityStore:
+    """Return the process-wide store shared by all host scripts."""
+    global _default_store
+    # Worker threads may be the first callers, open the database only once
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ActivityStore()
+    return _default_store
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding:utf-8 -*-
+"""
+Incremental sync of /athlete/activities into the local activity store.
+
+The first run walks every page of the athlete's activity history. The
+newest start_date seen is kept as a cursor, so later runs only ask for
+activities after it, which is usually a single small request.
+
+    python strava_sync.py [--full]
+"""
+
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from strava_client import StravaClient, default_client
+from strava_store import ActivityStore, default_store
+
+ACTIVITIES_URL = "https://www.strava.com/api/v3/athlete/activities"
+CURSOR_KEY = 'activities_after'
+PER_PAGE = 200  # Maximum page size allowed by Strava
+
+
+def start_timestamp(activity: Dict[str, Any]) -> int:
+    """Return an activity's start_date as Unix seconds."""
+    start = datetime.strptime(activity['start_date'], '%Y-%m-%dT%H:%M:%SZ')
+    return int(start.replace(tzinfo=timezone.utc).timestamp())
+
+
+def sync_activities(client: Optional[StravaClient] = None, store: Optional[ActivityStore] = None,
+                    full: bool = False, per_page: int = PER_PAGE) -> int:
+    """Bring the local activity store up to date.
+
+    Every page is saved as it arrives, but the cursor only moves once all
+    pages are in, so an interrupted sync is simply repeated next time.
+
+    Args:
+        client: Strava client, the shared default client if omitted
+        store: Activity store, the shared default store if omitted
+        full: Ignore the cursor and re-download the whole history, e.g. to
+            pick up activities edited after they were first synced
+        per_page: Activities per request
+
+    Returns:
+        int: Number of activities downloaded
+    """
+    client = client or default_client()
+    store = store or default_store()
+    after = None if full else store.get_state(CURSOR_KEY)
+    newest = after
+
+    count = 0
+    page = 1
+    while True:
+        params: Dict[str, Any] = {'per_page': per_page, 'page': page}
+        if after is not None:
+            params['after'] = after
+        batch = client.get_json(ACTIVITIES_URL, params=params)
+        print(f"Page {page}: {len(batch)} activities")
+        count += store.save_activities(batch)
+        for activity in batch:
+            timestamp = start_timestamp(activity)
+            if newest is None or timestamp > newest:
+                newest = timestamp
+        if len(batch) < per_page:
+            break
+        page += 1
+
+    if newest is not None:
+        store.set_state(CURSOR_KEY, newest)
+    print(f"Synced {count} new activities, {store.activity_count()} stored")
+    return count
+
+
+def main():
+    sync_activities(full='--full' in sys.argv)
+    print(f"Strava API usage: {default_client().rate_limiter.describe()}")
+    if default_client().cache:
+        print(f"Response cache: {default_client().cache.describe()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Shared Strava access-token cache for the D1 Mini firmware and the host scripts.
+
+The access token, its expiry and the (possibly rotated) refresh token are
+kept in memory and persisted to TOKEN_FILE, so a new token is only
+requested from /oauth/token when the cached one is about to expire.
+
+    >>> import strava_token
+    >>> access_token = strava_token.get_access_token()
+"""
+
+import sys
+import time
+import json
+import credentials as creds
+
+try:
+    import urequests as requests
+except ImportError:
+    import requests
+
+AUTH_URL = "https://www.strava.com/oauth/token"
+TOKEN_FILE = 'strava_token.json'
+REFRESH_MARGIN = 300  # Refresh when less than 5 minutes are left
+
+_MICROPYTHON = sys.implementation.name == 'micropython'
+# Seconds between 1970-01-01 and 2000-01-01, the epoch on MicroPython ports
+_EPOCH_OFFSET = 946684800 if time.gmtime(0)[0] == 2000 else 0
+
+# Any earlier clock reading means the RTC was never set since power-up
+_CLOCK_FLOOR = 1704067200  # 2024-01-01
+
+_cache = None
+
+def unix_time():
+    """Current time in seconds since 1970, as used by Strava's expires_at."""
+    return int(time.time()) + _EPOCH_OFFSET
+
+def _sync_clock():
+    """Set the RTC over NTP if it is still at its power-up value.
+
+    Without a valid clock expires_at cannot be checked. NTP is a single UDP
+    exchange, much cheaper than the TLS round trip to /oauth/token, so a
+    failed sync is retried on the next call.
+    """
+    if unix_time() > _CLOCK_FLOOR or not _MICROPYTHON:
+        return
+    try:
+        import ntptime
+        ntptime.settime()
+    except Exception as e:
+        print('Clock sync failed:', e)
+
+def _credentials():
+    """Return (client_id, client_secret, refresh_token) from credentials.py.
+
+    Both the STRAVA_* constants from credentials_template.py and the older
+    StravaCredentials dict are supported.
+    """
+    if hasattr(creds, 'StravaCredentials'):
+        c = creds.StravaCredentials
+        return c['client_id'], c['client_secret'], c['refresh_token']
+    return creds.STRAVA_CLIENT_ID, creds.STRAVA_CLIENT_SECRET, creds.STRAVA_REFRESH_TOKEN
+
+def _load():
+    try:
+        with open(TOKEN_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save(token):
+    try:
+        with open(TOKEN_FILE, 'w') as f:
+            json.dump(token, f)
+    except OSError as e:
+        print('Could not save token:', e)
+
+def _request_token(refresh_token):
+    """Exchange a refresh token for a new access token, or return None."""
+    client_id, client_secret, _ = _credentials()
+    payload = {
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'refresh_token': refresh_token,
+        'grant_type': 'refresh_token'
+    }
+    if _MICROPYTHON:
+        response = requests.post(AUTH_URL, json=payload)
+    else:
+        response = requests.post(AUTH_URL, data=payload, verify=False)
+    try:
+        if response.status_code != 200:
+            print('Token request failed with status', response.status_code)
+            return None
+        data = response.json()
+    finally:
+        response.close()
+    return {
+        'access_token': data['access_token'],
+        'expires_at': data['expires_at'],
+        'refresh_token': data.get('refresh_token', refresh_token)
+    }
+
+def get_access_token(force=False):
+    """Get a valid Strava access token, refreshing only near expiry.
+
+    Args:
+        force (bool): Ignore the cached token and request a new one
+
+    Returns:
+        str: The access token, or None if it could not be obtained
+    """
+    global _cache
+    if _cache is None:
+        _cache = _load()
+    _sync_clock()
+
+    # Near 2000 every expires_at looks like the future, so without a valid
+    # clock the cached token cannot be trusted and a new one is requested
+    now = unix_time()
+    if (not force and _cache and now > _CLOCK_FLOOR
+            and _cache.get('expires_at', 0) - REFRESH_MARGIN > now):
+        return _cache['access_token']
+
+    configured = _credentials()[2]
+    stored = _cache.get('refresh_token') if _cache else None
+    try:
+        token = None
+        if stored and stored != configured:
+            # Strava may have rotated the refresh token on an earlier run
+            token = _request_token(stored)
+        if token is None:
+            token = _request_token(configured)
+    except Exception as e:
+        print('Token Error:', e)
+        return None
+    if token is None:
+        return None
+
+    _cache = token
+    _save(token)
+    return token['access_token']
+
+def invalidate():
+    """Drop the cached access token, e.g. after the API answered 401.
+
+    The refresh token is kept so the next call can still rotate it.
+    """
+    if _cache:
+        _cache['expires_at'] = 0
+        _save(_cache)